@@ -9,8 +9,18 @@
 	Optimize solver...
 """
 import pygame as pg
-from time import sleep, time
-from random import choice, randint
+from time import sleep, time, perf_counter
+from random import choice, randint, Random
+from math import comb
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+import mmap
+import os
+import heapq
+import warnings
+from collections import OrderedDict
+import struct
+import queue
 
 #Increase to make board bigger
 relative_board_length = 950
@@ -81,22 +91,66 @@ board_length_width = (tile_length * board_width) + (margin_length * (board_width
 board_length_height = (tile_length * board_height) + (margin_length * (board_height + 1))
 displayW, displayH = (board_length_width, board_length_height)
 
+#Rendering caches (see get_tile_surface):
+tile_font = None
+tile_surfaces = {}
+
 
 class Board:
 
-	def __init__(self, width, height, bomb_percentage):
+	component_cache_size = 256 # Most components whose configurations are kept between solve_state calls
+
+	def __init__(self, width, height, bomb_percentage, compact=False, board_seed=None):
+		"""
+		@param compact (optional): keep the state of every tile in flat arrays on the board instead of in Tile objects,
+			board.tiles then creates CompactTile views on demand. This takes a few bytes per tile instead of a few hundred,
+			at the cost of slower tile access, so it is meant for very large boards.
+		@param board_seed (optional): seed of the board's random generator, which places the bombs (and moves them in
+			relocate_bombs). A board is recreated exactly from its size, bomb percentage, first tile and seed
+			(see create_from_seed). A random seed is picked if None.
+		"""
 		self.width = width
 		self.height = height
 		self.bomb_percentage = bomb_percentage
+		self.board_seed = randint(0, 2**32 - 1) if board_seed == None else board_seed
+		self.rng = Random(self.board_seed)
 		self.bomb_count = 0
 		self.tiles = []
 		self.nummed_tiles = [] # Tiles that appear as a number on the board (are surrounded by > 0 bombs and not a bomb themselves)
+		self.frontier = set() # Unrevealed tiles that are adjacent to revealed tiles, kept up to date by update_frontier
+		self.unsatisfied_tiles = {} # Numbered tiles that still have unrevealed, unflagged neighbors (a dict to keep reveal order)
 		self.n_flagged_by_solver = 0
+		self.n_revealed = 0 # Number of revealed tiles, kept up to date by Tile.reveal
+		self.n_flagged = 0 # Number of flagged tiles, kept up to date by Tile.is_flagged
+		self.n_found = 0 # Number of bombs the player has flagged, kept up to date by Tile.activate
+		self.dirty_tiles = None # Coordinates of the tiles marked needs_update since the last draw, None until the first draw
+		self.nodes_explored = 0 # Number of search nodes the configuration searches have visited on this board
 		self.win = False
 		self.lose = False
 		self.do_draw = True
+		self.visualizer = None # A SolverVisualizer to show solver progress with, the board is headless while this is None
+		self.stats = None # A SolverStats to record solver work into, nothing is recorded while this is None
+		self.component_cache = OrderedDict() # Component key (see get_component_key) to its configurations, least recently used first
+		self.budget = None # (deadline, node limit) of the bounded is_solvable call that is running, see check_budget
 		self.pre_reveal = True
 		self.first_tile = None
+		self.compact = compact
+		self.create_tiles()
+
+	def create_tiles(self):
+		"""Create self.tiles, once every other attribute has been set by __init__."""
+		width = self.width
+		height = self.height
+		if self.compact:
+			self.cell_flags = bytearray([CompactTile.NEEDS_UPDATE]) * (width * height) # CompactTile bits of every tile
+			self.cell_nums = bytearray(width * height)
+			# Neighbors of every tile (less than 8 on edges and corners), which is where the unknown neighbor counts start
+			columns = [min(x + 1, width - 1) - max(x - 1, 0) + 1 for x in range(width)]
+			rows = [min(y + 1, height - 1) - max(y - 1, 0) + 1 for y in range(height)]
+			self.cell_neighbor_counts = bytes([n_columns * n_rows - 1 for n_rows in rows for n_columns in columns])
+			self.cell_unknowns = bytearray(self.cell_neighbor_counts)
+			self.tiles = TileGrid(self)
+			return
 		for row in range(height):
 			self.tiles.append([])
 			for col in range(width):
@@ -104,17 +158,19 @@ class Board:
 				self.tiles[row].append(c)
 
 	@staticmethod
-	def create_custom_board(bomb_array, first_tile):
+	def create_custom_board(bomb_array, first_tile, compact=False):
 		"""Create a board from an array of either "x"s or "" with "x"
 		representing a bomb and anything else representing... not a bomb
 
 		AND
 
 		a tile that represents the first place a user clicks. This tile will
-		be revealed immediately."""
+		be revealed immediately.
+
+		compact is passed on to Board."""
 
 		# Create board
-		board = Board(len(bomb_array[0]), len(bomb_array), bomb_percentage=0)
+		board = Board(len(bomb_array[0]), len(bomb_array), bomb_percentage=0, compact=compact)
 		board.first_tile = first_tile
 
 		# Add bombs
@@ -122,7 +178,8 @@ class Board:
 			for col in range(len(bomb_array[row])):
 				if bomb_array[row][col] in ('x', 'F'):
 					board.tiles[row][col].is_bomb = True
-		board.bomb_count = sum([sum([1 for tile in row if tile.is_bomb]) for row in board.tiles])
+		board.bomb_count = sum([row.count('x') + row.count('F') for row in bomb_array])
+		board.compute_nums()
 
 		# Reveal first tile
 		if __name__ == '__main__':
@@ -133,25 +190,104 @@ class Board:
 		return board
 
 	@staticmethod
-	def generate_solvable_board(width, height, bomb_percentage, verbose=False):
+	def generate_solvable_board(width, height, bomb_percentage, verbose=False, workers=1, max_attempts=None, visualizer=None, stats=None, repair=False, max_repairs=None, time_limit=None, max_nodes=None):
+		"""
+		Generate boards until one is solvable.
+		Candidate boards are solved headless (without touching pygame) unless a visualizer is given.
+		@param workers (optional): number of processes trying candidate boards at the same time
+		@param max_attempts (optional): number of candidate boards to try before giving up, None to keep trying until one is solvable
+		@param visualizer (optional): a SolverVisualizer to attach to every candidate board (ignored when workers > 1)
+		@param stats (optional): a SolverStats to record the work of every candidate's solve into (ignored when workers > 1)
+		@param repair (optional): instead of throwing a candidate away when the solver gets stuck, move bombs away from
+			where it got stuck and carry on (see make_solvable). Nearly every candidate then becomes solvable.
+		@param max_repairs (optional): passed on to make_solvable
+		@param time_limit (optional): most seconds to spend generating, candidates still being solved at that point are given up on
+		@param max_nodes (optional): most search nodes to spend on a single candidate, candidates that need more are thrown away
+		@return the solvable Board (with its first tile revealed), or None if none of the candidates were solvable
+			or the time limit ran out
+		"""
+		if workers > 1:
+			return Board.generate_solvable_board_parallel(width, height, bomb_percentage, verbose, workers, max_attempts, repair, max_repairs, time_limit, max_nodes)
+		deadline = None if time_limit == None else perf_counter() + time_limit
 		attempts = 0
 		if verbose:
 			print("Attempting to generate a solvable board...")
-		while attempts < 10:
+		while max_attempts == None or attempts < max_attempts:
+			if deadline != None and perf_counter() >= deadline:
+				if verbose:
+					print(f"Ran out of time after {attempts} attempts.")
+				return None
+			attempts += 1
 			board = Board(width, height, bomb_percentage)
+			board.visualizer = visualizer
+			board.stats = stats
 			first_tile = choice(board.get_all_tiles())
 			first_tile.first_reveal()
-			# board.do_draw = False
-			if board.is_solvable():
+			remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+			if repair:
+				solvable = board.make_solvable(max_repairs, time_limit=remaining, max_nodes=max_nodes)
+			else:
+				solvable = board.is_solvable(time_limit=remaining, max_nodes=max_nodes)
+			if solvable:
 				if verbose:
 					print("Solvable board generated!")
 				board.do_draw = True
 				return board
 			else:
+				if verbose:
+					print(f"Not solvable (seed {board.board_seed}, first tile {board.first_tile}), trying again...")
+		if verbose:
+			print(f"Attempted {max_attempts} times to generate solvable boards and could not.")
+
+	@staticmethod
+	def generate_solvable_board_parallel(width, height, bomb_percentage, verbose=False, workers=2, max_attempts=None, repair=False, max_repairs=None, time_limit=None, max_nodes=None):
+		"""
+		Same as generate_solvable_board, but candidate boards are tried by a pool of worker processes.
+		The first solvable board found is returned and the candidates that haven't started yet are cancelled.
+		Cancelling is partial: candidates a worker has already started are solved to the end in the background
+		(use time_limit or max_nodes to bound how long that takes).
+		"""
+		deadline = None if time_limit == None else perf_counter() + time_limit
+		if verbose:
+			print(f"Attempting to generate a solvable board with {workers} workers...")
+		# Spawn (rather than fork) so the workers never inherit the pygame window
+		executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+		try:
+			attempts = 0
+			pending = set()
+			while max_attempts == None or attempts < max_attempts or pending:
+				while (max_attempts == None or attempts < max_attempts) and len(pending) < workers:
+					attempts += 1
+					remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+					pending.add(executor.submit(try_candidate_board, width, height, bomb_percentage, randint(0, 2**32 - 1), repair, max_repairs, remaining, max_nodes))
+				remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+				done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+				if not done:
+					if verbose:
+						print(f"Ran out of time after {attempts} attempts.")
+					return None
+				for future in done:
+					result = future.result()
+					if result != None:
+						bomb_array, first_tile = result
+						if verbose:
+							print("Solvable board generated!")
+						board = Board.create_custom_board(bomb_array, first_tile)
+						board.bomb_percentage = bomb_percentage
+						return board
 				if verbose:
 					print("Not solvable, trying again...")
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
 		if verbose:
-			print("Attempted 10 times to generate solvable boards and could not.")
+			print(f"Attempted {max_attempts} times to generate solvable boards and could not.")
+
+	@staticmethod
+	def create_from_seed(width, height, bomb_percentage, first_tile, board_seed, compact=False):
+		"""Recreate the board generated with board_seed (see Board), with first_tile revealed."""
+		board = Board(width, height, bomb_percentage, compact=compact, board_seed=board_seed)
+		board.tiles[first_tile[1]][first_tile[0]].first_reveal()
+		return board
 
 	@staticmethod
 	def create_state(matrix, first_tile=None):
@@ -191,6 +327,24 @@ class Board:
 				tile.is_flagged = True
 		return board
 
+	@staticmethod
+	def create_from_mask(width, height, bomb_mask, first_tile, compact=False):
+		"""Same as create_custom_board, but the bombs are given as a mask where bit (y * width + x) stands for the tile at (x, y)."""
+		bomb_array = [['x' if bomb_mask >> (y * width + x) & 1 else ' ' for x in range(width)] for y in range(height)]
+		return Board.create_custom_board(bomb_array, first_tile, compact)
+
+	def get_bomb_mask(self):
+		"""Return the bombs of the board as a mask where bit (y * width + x) stands for the tile at (x, y)."""
+		bomb_mask = 0
+		for tile in self.get_all_tiles():
+			if tile.is_bomb:
+				bomb_mask |= 1 << (tile.y * self.width + tile.x)
+		return bomb_mask
+
+	def get_bomb_array(self):
+		"""Return the bombs of the board as an array of "x"s and " "s (the format create_custom_board takes)."""
+		return [['x' if tile.is_bomb else ' ' for tile in row] for row in self.tiles]
+
 	def get_state(self):
 		"""
 		Return a matrix (2d array) of characters representing the current state of the board:
@@ -219,8 +373,46 @@ class Board:
 		return state
 
 
+	def to_bitboard(self):
+		"""Return a BitBoard holding the current state of the board."""
+		bitboard = BitBoard(self.width, self.height)
+		bombs = 0
+		for tile in self.get_all_tiles():
+			bit = 1 << (tile.y * self.width + tile.x)
+			if tile.is_bomb:
+				bombs |= bit
+			if tile.is_revealed:
+				bitboard.revealed |= bit
+			if tile.is_flagged:
+				bitboard.flagged |= bit
+		bitboard.set_bombs(bombs)
+		bitboard.bomb_count = self.bomb_count
+		bitboard.n_flagged_by_solver = self.n_flagged_by_solver
+		bitboard.lose = self.lose
+		return bitboard
+
+	def load_bitboard(self, bitboard):
+		"""Write the revealed and flagged tiles of a BitBoard (created by to_bitboard) back to the board."""
+		for tile in self.get_all_tiles():
+			bit = 1 << (tile.y * self.width + tile.x)
+			if bitboard.flagged & bit:
+				tile.is_flagged = True
+				tile.needs_update = True
+		for tile in self.get_all_tiles():
+			if bitboard.revealed & (1 << (tile.y * self.width + tile.x)) and not tile.is_revealed:
+				tile.reveal()
+		self.n_flagged_by_solver = bitboard.n_flagged_by_solver
+
+	def visualize(self, force=False):
+		"""Show the board on the attached visualizer if there is one and it is due for a redraw.
+		@param force (optional): ignore the visualizer's frame rate limit"""
+		if self.visualizer != None and (force or self.visualizer.is_due()):
+			self.visualizer.show(self)
+
 	def get_all_tiles(self):
 		"""Return a list of all tiles on the board."""
+		if self.compact:
+			return [CompactTile(self, index) for index in range(self.width * self.height)]
 		tiles = []
 		for row in self.tiles:
 			for tile in row:
@@ -229,90 +421,144 @@ class Board:
 
 	def draw(self,draw_all=False):
 		"""Draws the every tile in self.tiles and textto the board.
-		Will also update to check for win or lose."""
+		Will also update to check for win or lose.
+		@return the rectangles of the screen that were drawn on, to pass to pg.display.update"""
 		if not self.do_draw:
-			return;
+			return [];
 
-		foundTiles = []
-		revealedTiles = []
-		flaggedTiles = []
-		unrevealedTiles = []
-		for row in self.tiles:
-			for tile in row:
-				if tile.is_flagged:
-					flaggedTiles.append(tile)
-				if tile.is_found:
-					foundTiles.append(tile)
-				if tile.is_revealed:
-					revealedTiles.append(tile)
-				else:
-					unrevealedTiles.append(tile)
-				if draw_all or tile.needs_update:
-					tile.draw()
+		# Only the tiles marked since the last draw are looked at (every tile on the first draw)
+		if draw_all or self.dirty_tiles == None:
+			tiles = self.get_all_tiles()
+		else:
+			tiles = [self.tiles[y][x] for x, y in self.dirty_tiles]
+		self.dirty_tiles = set()
+		drawn = []
+		for tile in tiles:
+			if draw_all or tile.needs_update:
+				drawn.append(tile.draw())
 
 		if __name__ == '__main__':
-			pg.display.set_caption(f'Maxsweeper - Bombs left: {str(self.bomb_count - len(flaggedTiles))} - {str(round(timer.query()))} seconds')
+			pg.display.set_caption(f'Maxsweeper - Bombs left: {str(self.bomb_count - self.n_flagged)} - {str(round(timer.query()))} seconds')
 		else:
-			pg.display.set_caption(f'Maxsweeper - Bombs left: {str(self.bomb_count - len(flaggedTiles))}')
+			pg.display.set_caption(f'Maxsweeper - Bombs left: {str(self.bomb_count - self.n_flagged)}')
 
 		if not self.pre_reveal and not self.lose:
-			if len(foundTiles) == self.bomb_count and self.bomb_count - len(flaggedTiles) >= 0:
+			if self.n_found == self.bomb_count and self.bomb_count - self.n_flagged >= 0:
 				self.win = True
 				#Code below reveals all non-bomb tiles that have not been revealed.
-				for tile in unrevealedTiles:
+				for tile in self.get_all_tiles():
 					if not tile.is_revealed:
 						tile.reveal()
-			elif len(revealedTiles) == self.width * self.height - self.bomb_count:
+			elif self.n_revealed == self.width * self.height - self.bomb_count:
 				self.win = True
 				#Code below flags all bombs that have not been flagged.
-				for tile in unrevealedTiles:
-					tile.is_flagged = True
+				for tile in self.get_all_tiles():
+					if not tile.is_revealed:
+						tile.is_flagged = True
+		return drawn
 
 	def add_bombs(self, mainSafeTile):
 		"""Adds bombs to the board.
-		The mainSafeTile and it's 8 surrounding tiles will not have bombs."""
+		The mainSafeTile and it's 8 surrounding tiles will not have bombs.
+		The bombs are placed in a single pass over the board using the board's own random generator: every tile that may
+		hold a bomb gets one with a chance of (bombs still to place / tiles left), which places exactly the right number
+		of bombs without any retries or extra memory."""
 		self.first_tile = mainSafeTile.coords
 		safeTiles = mainSafeTile.surrounding_bombs(mode=3)
 		safeTiles.append(mainSafeTile)
 		chance = self.bomb_percentage / 100
 		bombs_num = int(self.width * self.height * chance)
-		for tile in range(bombs_num):
-			while True:
-				r_coords = (randint(0, self.width - 1), randint(0, self.height - 1))
-				if not self.tiles[r_coords[1]][r_coords[0]].is_bomb:
-					for safeTile in safeTiles:
-						if safeTile.coords == r_coords:
-							break
-					else:
-						self.tiles[r_coords[1]][r_coords[0]].is_bomb = True
-						break
+		safe_indices = set([tile.y * self.width + tile.x for tile in safeTiles])
+		tiles_left = self.width * self.height - len(safe_indices)
+		if bombs_num > tiles_left:
+			raise ValueError(f'{bombs_num} bombs do not fit on a {self.width}x{self.height} board outside the first tile\'s opening')
+		bombs_left = bombs_num
+		for index in range(self.width * self.height):
+			if bombs_left == 0:
+				break
+			if index in safe_indices:
+				continue
+			if self.rng.random() * tiles_left < bombs_left:
+				if self.compact:
+					self.cell_flags[index] |= CompactTile.BOMB
+				else:
+					self.tiles[index // self.width][index % self.width].is_bomb = True
+				bombs_left -= 1
+			tiles_left -= 1
 		self.bomb_count = bombs_num
+		self.compute_nums()
+
+	def compute_nums(self):
+		"""Compute the number of every tile once the bombs are placed.
+		Each bomb adds one to its neighbors, so this costs 8 steps per bomb instead of 8 per tile."""
+		if self.compact:
+			# Walk the flag bytes instead of creating a view of every tile
+			self.cell_nums = bytearray(self.width * self.height)
+			for index, flags in enumerate(self.cell_flags):
+				if flags & CompactTile.BOMB:
+					for neighbor in CompactTile(self, index).surrounding_bombs(mode=3):
+						if not neighbor.is_bomb:
+							neighbor.num += 1
+			return
+		for tile in self.get_all_tiles():
+			tile.num = 0
+		for tile in self.get_all_tiles():
+			if tile.is_bomb:
+				for neighbor in tile.surrounding_bombs(mode=3):
+					if not neighbor.is_bomb:
+						neighbor.num += 1
 
 	def get_exposed_tiles(self, includeFlagged=True):
-		"""Return a list of all unrevealed tiles that are adjacent to revealed tiles."""
-		exposed_tiles = []
-		for row in self.tiles:
-			for tile in row:
-				if (tile.is_flagged) and not includeFlagged:
-					continue
-				if not tile.is_revealed:
-					for neighbor_tile in tile.surrounding_bombs(mode=3):
-						if neighbor_tile.is_revealed:
-							if tile not in exposed_tiles:
-								exposed_tiles.append(tile)
-								break
-		return exposed_tiles
+		"""Return a list of all unrevealed tiles that are adjacent to revealed tiles (in board order)."""
+		exposed_tiles = [tile for tile in self.frontier if includeFlagged or not tile.is_flagged]
+		return sorted(exposed_tiles, key=lambda tile: (tile.y, tile.x))
+
+	def update_frontier(self, tile, neighbors):
+		"""Update self.frontier and self.unsatisfied_tiles after tile (surrounded by neighbors) has been revealed."""
+		self.frontier.discard(tile)
+		for neighbor in neighbors:
+			# tile was unrevealed and unflagged, so it was one of its neighbors' unknowns
+			neighbor.n_unknown -= 1
+			if not neighbor.is_revealed:
+				self.frontier.add(neighbor)
+			elif neighbor.n_unknown == 0:
+				self.unsatisfied_tiles.pop(neighbor, None)
+		if tile.num > 0 and not tile.is_bomb and tile.n_unknown > 0:
+			self.unsatisfied_tiles[tile] = None
+
+	def update_unsatisfied(self, tile):
+		"""Update the unknown neighbor counts and self.unsatisfied_tiles after tile has been flagged or unflagged."""
+		if tile.is_revealed:
+			return
+		change = -1 if tile.is_flagged else 1
+		for neighbor in tile.surrounding_bombs(mode=3):
+			neighbor.n_unknown += change
+			if neighbor.is_revealed and neighbor.num > 0 and not neighbor.is_bomb:
+				if neighbor.n_unknown > 0:
+					self.unsatisfied_tiles[neighbor] = None
+				else:
+					self.unsatisfied_tiles.pop(neighbor, None)
 
 	def reset(self):
 		"""
 		Reset the board to its initial state (after the first tile is revealed)
 		"""
-		for tile in self.get_all_tiles():
-			tile.is_flagged = False
-			tile.is_revealed = False
-			tile.is_found = False
-			tile.needs_update = False
+		if self.compact:
+			self.cell_flags = bytearray([flags & CompactTile.BOMB for flags in self.cell_flags])
+			self.cell_unknowns = bytearray(self.cell_neighbor_counts)
+		else:
+			for tile in self.get_all_tiles():
+				tile._is_flagged = False # The unknown neighbor counts are rebuilt below
+				tile.is_revealed = False
+				tile.is_found = False
+				tile.needs_update = False
+				tile.n_unknown = tile.count_neighbors()
 		self.nummed_tiles = []
+		self.frontier = set()
+		self.unsatisfied_tiles = {}
+		self.n_revealed = 0
+		self.n_flagged = 0
+		self.n_found = 0
 		self.win = False
 		self.lose = False
 		self.pre_reveal = True
@@ -320,105 +566,522 @@ class Board:
 		self.pre_reveal = False
 		self.n_flagged_by_solver = 0
 
-	def is_solvable(self, reset_on_finish=True):
+	def is_solvable(self, reset_on_finish=True, use_bitboard=False, use_probabilities=False, backend=None, time_limit=None, max_nodes=None):
 		"""
-		@return True if the board is could be solved, False if it is not solvable.
+		@param use_bitboard (optional): solve on a BitBoard copy of the board instead of on the tiles.
+			The result is only written back to the tiles at the end (and not at all if reset_on_finish is True).
+		@param use_probabilities (optional): passed on to solve_state, can't be combined with use_bitboard
+		@param backend (optional): passed on to solve_state, can't be combined with use_bitboard
+		@param time_limit (optional): most seconds to spend solving, can't be combined with use_bitboard
+		@param max_nodes (optional): most search nodes (see nodes_explored) to visit, can't be combined with use_bitboard
+		@return True if the board is could be solved, False if it is not solvable,
+			None if the time limit or node budget ran out before the solver could tell.
 		"""
-		# Solve each state
-		while self.solve_state():
-			if __name__ == "__main__":
-				self.draw()
-				pg.display.update()
-				clock.tick()
-
-		# Check for win or stuck
-		solved = False
-		unrevealed_tile_count = sum([0 if tile.is_revealed else 1 for tile in self.get_all_tiles()])
-		if unrevealed_tile_count == self.bomb_count:
-			solved = True
+		if use_bitboard and use_probabilities:
+			raise ValueError('use_probabilities is not supported when solving on a BitBoard')
+		if use_bitboard and backend != None:
+			raise ValueError('backend is not supported when solving on a BitBoard')
+		if use_bitboard and (time_limit != None or max_nodes != None):
+			raise ValueError('time_limit and max_nodes are not supported when solving on a BitBoard')
+		if self.stats != None:
+			start = perf_counter()
+			self.stats.record_frontier(len(self.frontier))
+		if use_bitboard:
+			bitboard = self.to_bitboard()
+			solved = self.run_tier('bitboard', bitboard.is_solvable)
+			if not reset_on_finish:
+				self.load_bitboard(bitboard)
+			for tile in self.get_all_tiles():
+				tile.needs_update = True
+			if self.stats != None:
+				self.stats.record_solve(perf_counter() - start, solved)
+			return solved
 
+		# Solve each state
+		if time_limit != None or max_nodes != None:
+			self.budget = (
+				None if time_limit == None else perf_counter() + time_limit,
+				None if max_nodes == None else self.nodes_explored + max_nodes
+			)
+		try:
+			while self.solve_state(use_probabilities=use_probabilities, backend=backend):
+				self.visualize()
+				if self.budget != None:
+					self.check_budget(check_time=True)
+			# Show where the solver ended up, however recently the last step was drawn
+			self.visualize(force=True)
+
+			# Check for win or stuck
+			solved = False
+			unrevealed_tile_count = self.width * self.height - self.n_revealed
+			if unrevealed_tile_count == self.bomb_count:
+				solved = True
+		except BudgetExceeded:
+			solved = None
+		finally:
+			self.budget = None
+
+		if self.stats != None:
+			self.stats.record_solve(perf_counter() - start, solved)
 		if reset_on_finish:
 			self.reset()
 		for tile in self.get_all_tiles():
 			tile.needs_update = True
 		return solved
 
-	def solve_state(self):
+	def check_budget(self, extra_nodes=0, check_time=False):
+		"""Raise BudgetExceeded if the bounded is_solvable call that is running (see self.budget) has used up its nodes
+		or its time. The searches call this at every node, so the clock is only read every 64 nodes unless check_time is True.
+		@param extra_nodes (optional): nodes visited that aren't in self.nodes_explored yet"""
+		deadline, node_limit = self.budget
+		nodes = self.nodes_explored + extra_nodes
+		if node_limit != None and nodes > node_limit:
+			raise BudgetExceeded()
+		if deadline != None and (check_time or nodes % 64 == 0) and perf_counter() > deadline:
+			raise BudgetExceeded()
+
+	def make_solvable(self, max_repairs=None, bombs_per_repair=1, time_limit=None, max_nodes=None):
+		"""
+		Solve the board, and every time the solver gets stuck move bombs away from where it got stuck (see relocate_bombs)
+		and carry on solving from there. Moving a bomb changes numbers that earlier deductions may have used, so once the
+		board is solved it is solved again from the first tile, and repaired further if that gets stuck somewhere.
+		@param max_repairs (optional): most times to relocate bombs before giving up, defaults to the number of bombs
+		@param bombs_per_repair (optional): number of bombs to relocate each time the solver gets stuck
+		@param time_limit (optional): most seconds to spend on all the solving
+		@param max_nodes (optional): most search nodes to visit over all the solving
+		@return True if the board is solvable (it is then reset to its first state), False if it could not be repaired,
+			None if the time limit or node budget ran out first (the board is then reset too).
+		@changes the bombs and numbers of the board
+		"""
+		if max_repairs == None:
+			max_repairs = self.bomb_count
+		deadline = None if time_limit == None else perf_counter() + time_limit
+		node_limit = None if max_nodes == None else self.nodes_explored + max_nodes
+		repairs = 0
+		verified = True # Whether the current state was reached from the first tile with the bombs as they are now
+		while True:
+			solved = self.is_solvable(
+				reset_on_finish=False,
+				time_limit=None if deadline == None else max(deadline - perf_counter(), 0),
+				max_nodes=None if node_limit == None else max(node_limit - self.nodes_explored, 0)
+			)
+			if solved == None:
+				self.reset()
+				return None
+			if solved:
+				self.reset()
+				if verified:
+					return True
+				verified = True
+				continue
+			if repairs == max_repairs or self.relocate_bombs(bombs_per_repair) == 0:
+				self.reset()
+				return False
+			repairs += 1
+			verified = False
+
+	def relocate_bombs(self, count=1):
+		"""
+		Move up to count bombs from the exposed tiles (unrevealed, unflagged tiles next to revealed ones) to random
+		unrevealed tiles that aren't next to any revealed tile, so that only the numbers around the tiles that lost a bomb change.
+		Revealed tiles that become 0 tiles open up their neighbors like in a normal reveal.
+		Near the end of a board every unrevealed tile can be exposed, the bombs are then moved to any tile outside the
+		first tile's opening (revealed or not) and the board is reset, since its revealed tiles may now hold bombs.
+		@return the number of bombs moved (0 if there is no bomb on the exposed tiles or nowhere to move it to)
+		@changes the bombs and numbers of the board
+		"""
+		sources = [tile for tile in self.get_exposed_tiles(includeFlagged=False) if tile.is_bomb]
+		destinations = [tile for tile in self.get_all_tiles() if not tile.is_revealed and not tile.is_flagged and not tile.is_bomb and tile not in self.frontier]
+		start_over = not destinations
+		if start_over:
+			first_tile = self.tiles[self.first_tile[1]][self.first_tile[0]]
+			opening = set(first_tile.surrounding_bombs(mode=3) + [first_tile])
+			destinations = [tile for tile in self.get_all_tiles() if not tile.is_bomb and not tile.is_flagged and tile not in self.frontier and tile not in opening]
+		self.rng.shuffle(sources)
+		self.rng.shuffle(destinations)
+		moved = min(count, len(sources), len(destinations))
+		changed_tiles = {} # Revealed tiles whose number went down (a dict to keep order)
+		for source, destination in zip(sources[:moved], destinations[:moved]):
+			source.is_bomb = False
+			destination.is_bomb = True
+			destination.num = 0
+			for neighbor in destination.surrounding_bombs(mode=3):
+				if not neighbor.is_bomb:
+					neighbor.num += 1
+			source.num = 0
+			for neighbor in source.surrounding_bombs(mode=3):
+				if neighbor.is_bomb:
+					source.num += 1
+				else:
+					neighbor.num -= 1
+					if neighbor.is_revealed:
+						changed_tiles[neighbor] = None
+
+		if start_over:
+			if moved > 0:
+				self.reset()
+			return moved
+		# A tile that became a 0 tile is no longer a number and opens up its neighbors
+		for tile in changed_tiles:
+			if tile.num == 0:
+				self.unsatisfied_tiles.pop(tile, None)
+				if tile in self.nummed_tiles:
+					self.nummed_tiles.remove(tile)
+				for neighbor in tile.surrounding_bombs(mode=3):
+					neighbor.reveal()
+		return moved
+
+	def run_tier(self, name, function, *args):
+		"""Return function(*args), recording its wall time and search nodes as the solver tier 'name' in self.stats (if there is one)."""
+		if self.stats == None:
+			return function(*args)
+		start = perf_counter()
+		nodes = self.nodes_explored
+		result = function(*args)
+		self.stats.record_tier(name, perf_counter() - start, self.nodes_explored - nodes)
+		return result
+
+	def solve_state(self, use_probabilities=False, backend=None):
 		"""
 		Uncover every tile that is definitely not a bomb and flag all those that definitely are
 		given the current board state.
+		@param use_probabilities (optional): same as backend='probability'
+		@param backend (optional): the SolverBackend (or the name of one in solver_backends) used once the quick rules are stuck,
+			defaults to enumerating every configuration
 		@return True if the state changed, False otherwise.
 		@changes self.tiles
 		"""
-		if (self.quick_solve_state()):
+		if (self.run_tier('quick', self.quick_solve_state)):
+			return True
+		if (self.run_tier('subset', self.subset_solve_state)):
 			return True
 
-		state_changed = False
-		# Get all possible configurations of bombs on exposed tiles
-		configurations = self.get_configurations()
-		for tile in self.get_all_tiles():
-			tile.is_bomb_in_config = False
-			tile.is_non_bomb_in_config = False
-			tile.needs_update = True
-
-		# Determine which tiles are ALWAYS bombs and which are ALWAYS not bombs
-		master_configuration = configurations[0]
-		all_bombs_in_exposed_tiles = list(master_configuration.values()).count(True) + self.n_flagged_by_solver == self.bomb_count
-		for configuration in configurations[1:]:
-			if list(configuration.values()).count(True) + self.n_flagged_by_solver != self.bomb_count:
-				all_bombs_in_exposed_tiles = False
-			for key in configuration:
-				if configuration[key] != master_configuration[key]:
-					master_configuration[key] = None
+		backend = Board.get_backend(backend, use_probabilities)
+		if self.stats != None:
+			self.stats.record_frontier(len(self.frontier))
+		deductions = self.run_tier(backend.name, backend.get_deductions, self)
+		if self.visualizer != None:
+			for tile in self.get_all_tiles():
+				tile.is_bomb_in_config = False
+				tile.is_non_bomb_in_config = False
+				tile.needs_update = True
+		if deductions == None:
+			# No configuration fits the board, there is nothing to deduce
+			return False
+		safe_tiles, bomb_tiles, unexposed_safe = deductions
+		exposed_tiles = set(self.frontier)
 
 		# Uncover all tiles that are definitely not bombs and flag all that are
-		for tile, is_bomb in master_configuration.items():
-			x,y = tile
-			if is_bomb:
-				self.tiles[y][x].is_flagged = True
-				self.n_flagged_by_solver += 1
-			elif is_bomb == False:
-				state_changed = True
-				self.tiles[y][x].reveal()
-		if all_bombs_in_exposed_tiles:
+		state_changed = False
+		for tile in bomb_tiles:
+			tile.is_flagged = True
+			self.n_flagged_by_solver += 1
+		for tile in safe_tiles:
+			state_changed = True
+			tile.reveal()
+		if unexposed_safe:
 			# Uncover all unexposed tiles
 			for tile in self.get_all_tiles():
-				# every config has the exposed tile coords as keys
-				if tile.coords not in master_configuration and not tile.is_revealed and not tile.is_flagged:
+				if tile not in exposed_tiles and not tile.is_revealed and not tile.is_flagged:
 					state_changed = True
 					tile.reveal()
 
 		return state_changed
 
-	def quick_solve_state(self):
-		"""Use the most basic Minesweeper rules (satisfaction and requirement) to find a single change (if one can be found)"""
-		for tile in self.nummed_tiles:
-			neighbors = tile.surrounding_bombs(mode=3)
-			possible_bomb_spots = 0
-			flagged_spots = 0
-			for neighbor in neighbors:
-				if not neighbor.is_revealed:
-					possible_bomb_spots += 1
-					if neighbor.is_flagged:
-						flagged_spots += 1
-
-			# Check if tile requires all neighboring unreaveled tiles to be bombs
-			if (possible_bomb_spots == tile.num and flagged_spots < tile.num):
-				neighbors = tile.surrounding_bombs(mode=3)
-				for neighbor in neighbors:
-					if not neighbor.is_revealed:
-						if not neighbor.is_flagged:
-							neighbor.is_flagged = True
-							self.n_flagged_by_solver += 1
-						neighbor.needs_update = True
-				return True
+	@staticmethod
+	def get_backend(backend=None, use_probabilities=False):
+		"""Return the SolverBackend that solve_state uses for the given backend (a SolverBackend, a name in solver_backends
+		or None) and use_probabilities arguments."""
+		if backend == None:
+			backend = 'probability' if use_probabilities else 'enumerate'
+		if isinstance(backend, str):
+			if backend not in solver_backends:
+				raise ValueError(f'Unknown solver backend: {backend}')
+			backend = solver_backends[backend]
+		return backend
+
+	def get_moves(self, apply=True, use_probabilities=False, backend=None):
+		"""
+		Yield the solver's deductions one at a time, as soon as the tier that finds them has run, as tuples (coords, is_bomb, tier)
+		where tier is the solver tier that proved it ('quick', 'subset' or the backend's name). The tiers are tried in the same order
+		as in solve_state, so the cheap ones come first, and the caller can stop iterating at any point to skip the rest.
+		Every tile is only yielded once.
+		@param apply (optional): flag or reveal every deduction before yielding it and keep going until the solver is stuck,
+			like is_solvable(reset_on_finish=False). If False the board is not changed and only the deductions that follow
+			from the current state (from the first tier that finds any) are yielded.
+		@param use_probabilities, backend (optional): same as for solve_state
+		"""
+		backend = Board.get_backend(backend, use_probabilities)
+		yielded = set()
+		while True:
+			found = False
+			for tier, groups in self.get_tier_moves(backend):
+				for group in groups:
+					for tile, is_bomb in group:
+						# Earlier moves of the step (or the tiles their reveals opened up) may already have settled the tile
+						if tile.is_revealed or tile.is_flagged or tile.coords in yielded:
+							continue
+						found = True
+						if not apply:
+							yielded.add(tile.coords)
+						else:
+							self.apply_move(tile, is_bomb)
+						yield tile.coords, is_bomb, tier
+				if found:
+					break
+			if not found or not apply:
+				return
+
+	def get_tier_moves(self, backend):
+		"""Yield (tier, groups) for each solver tier in turn, where groups are the lists of moves it found (see get_quick_moves).
+		A tier is only run once the previous one's groups are used, and finding them is recorded in self.stats like in solve_state."""
+		yield 'quick', self.run_tier('quick', list, self.get_quick_moves())
+		yield 'subset', self.run_tier('subset', list, self.get_subset_moves())
+		yield backend.name, [self.get_backend_moves(backend)]
+
+	def apply_move(self, tile, is_bomb):
+		"""Flag the tile if is_bomb, otherwise reveal it."""
+		if is_bomb:
+			if not tile.is_flagged:
+				tile.is_flagged = True
+				self.n_flagged_by_solver += 1
+			tile.needs_update = True
+		else:
+			tile.reveal()
+
+	def apply_first_group(self, groups):
+		"""
+		Apply the first group of moves from groups (see get_quick_moves).
+		@return True if there was a group to apply, False otherwise.
+		"""
+		for group in groups:
+			for tile, is_bomb in group:
+				if not tile.is_revealed:
+					self.apply_move(tile, is_bomb)
+			return True
+		return False
 
+	def get_quick_moves(self):
+		"""Yield a list of moves (tile, is_bomb) for every numbered tile whose unknown neighbors the most basic Minesweeper
+		rules settle: all of them are bombs if the tile needs every one, and all of them are safe if it is already satisfied."""
+		# Numbered tiles with no unrevealed, unflagged neighbors can't change anything
+		for tile in list(self.unsatisfied_tiles):
+			unknowns = []
+			flagged_spots = 0
+			for neighbor in tile.surrounding_bombs(mode=3):
+				if neighbor.is_flagged:
+					flagged_spots += 1
+				elif not neighbor.is_revealed:
+					unknowns.append(neighbor)
+			if not unknowns:
+				continue
+			# Check if tile requires all neighboring unrevealed tiles to be bombs
+			if flagged_spots + len(unknowns) == tile.num:
+				yield [(neighbor, True) for neighbor in unknowns]
 			# Check if tile is already satisfied
-			if (flagged_spots == tile.num and possible_bomb_spots > tile.num):
-				neighbors = tile.surrounding_bombs(mode=2) # Reveal all tiles neighbors (revealing flagged tiles does nothing)
-				return True
+			elif flagged_spots == tile.num:
+				yield [(neighbor, False) for neighbor in unknowns]
+
+	def get_subset_moves(self):
+		"""Yield a list of moves (tile, is_bomb) for every pair of overlapping numbered tiles that settles some tiles.
+		If tile A still needs a bombs among its unknown neighbors and tile B needs b among its own, then B's unknowns that A
+		doesn't share hold at least b - a bombs. When that is exactly how many there are, they are all bombs and
+		A's unknowns that B doesn't share are all safe (this covers the 1-1 and 1-2-1 patterns, and the case where A's
+		unknowns are a subset of B's)."""
+		unknowns = {}
+		needed = {}
+		for tile in self.unsatisfied_tiles:
+			unknowns[tile] = set()
+			needed[tile] = tile.num
+			for neighbor in tile.surrounding_bombs(mode=3):
+				if neighbor.is_flagged:
+					needed[tile] -= 1
+				elif not neighbor.is_revealed:
+					unknowns[tile].add(neighbor)
+
+		for tile_a in unknowns:
+			# Only numbered tiles sharing an unknown neighbor with tile_a can tell anything about it
+			overlapping_tiles = []
+			for unknown in unknowns[tile_a]:
+				for neighbor in unknown.surrounding_bombs(mode=3):
+					if neighbor in unknowns and neighbor != tile_a and neighbor not in overlapping_tiles:
+						overlapping_tiles.append(neighbor)
+
+			for tile_b in overlapping_tiles:
+				only_a = unknowns[tile_a] - unknowns[tile_b]
+				only_b = unknowns[tile_b] - unknowns[tile_a]
+				if needed[tile_b] - needed[tile_a] != len(only_b) or not (only_a or only_b):
+					continue
+				yield [(tile, True) for tile in sorted(only_b, key=lambda tile: (tile.y, tile.x))] + \
+					[(tile, False) for tile in sorted(only_a, key=lambda tile: (tile.y, tile.x))]
+
+	def get_backend_moves(self, backend):
+		"""Return the list of moves (tile, is_bomb) for every tile the backend's deductions settle (see solve_state)."""
+		if self.stats != None:
+			self.stats.record_frontier(len(self.frontier))
+		deductions = self.run_tier(backend.name, backend.get_deductions, self)
+		if self.visualizer != None:
+			for tile in self.get_all_tiles():
+				tile.is_bomb_in_config = False
+				tile.is_non_bomb_in_config = False
+				tile.needs_update = True
+		if deductions == None:
+			return []
+		safe_tiles, bomb_tiles, unexposed_safe = deductions
+		exposed_tiles = set(self.frontier)
+		moves = [(tile, True) for tile in bomb_tiles] + [(tile, False) for tile in safe_tiles]
+		if unexposed_safe:
+			for tile in self.get_all_tiles():
+				if tile not in exposed_tiles and not tile.is_revealed and not tile.is_flagged:
+					moves.append((tile, False))
+		return moves
 
-		return False
+	def get_probabilities(self):
+		"""
+		Return the exact probability of every unrevealed, unflagged tile being a bomb given the current board state
+		as a dictionary of tile coordinates to floats (empty if no configuration fits the board).
+		"""
+		weights, unexposed_weight, total = self.get_bomb_weights()
+		if total == 0:
+			return {}
+		probabilities = {}
+		for tile in self.get_all_tiles():
+			if not tile.is_revealed and not tile.is_flagged:
+				probabilities[tile.coords] = weights.get(tile.coords, unexposed_weight) / total
+		return probabilities
+
+	def get_best_guess(self):
+		"""Return the coordinates of the unrevealed tile that is least likely to be a bomb (the first one in board order on ties),
+		or None if there is no such tile."""
+		probabilities = self.get_probabilities()
+		if not probabilities:
+			return None
+		return min(probabilities, key=lambda coords: (probabilities[coords], coords[1], coords[0]))
+
+	def get_bomb_weights(self):
+		"""
+		Count the ways the remaining bombs can be placed on the board, without storing any configuration.
+		Each configuration of the exposed tiles with K bombs can be completed in comb(unexposed tiles, bombs left - K) ways,
+		so that is its weight.
+		@return a tuple (weights, unexposed_weight, total):
+
+			- weights: a dictionary of exposed tile coordinates to the total weight of the configurations where it is a bomb
+			- unexposed_weight: the total weight of the placements where one particular unexposed tile is a bomb
+			- total: the total weight of all placements (0 if no configuration fits the board)
+		"""
+		components = self.get_components()
+		# Every flag (placed by the solver, the user or create_state) is counted as a bomb
+		bombs_left = self.bomb_count - self.n_flagged
+		unexposed_tiles = self.width * self.height - self.n_revealed - self.n_flagged - sum([len(tiles) for tiles, constraints in components])
+		counts = [self.count_configurations(tiles, constraints, bombs_left) for tiles, constraints in components]
+		ways = [dict([(bombs, n_ways) for bombs, (n_ways, bomb_counts) in component_counts.items()]) for component_counts in counts]
+
+		# prefix[i] / suffix[i] hold the number of ways to place each number of bombs on the components before / from i
+		prefix = [{0: 1}]
+		for component_ways in ways:
+			prefix.append(Board.convolve(prefix[-1], component_ways, bombs_left))
+		suffix = [{0: 1}]
+		for component_ways in reversed(ways):
+			suffix.insert(0, Board.convolve(component_ways, suffix[0], bombs_left))
+
+		total = 0
+		unexposed_weight = 0
+		for bombs, n_ways in prefix[-1].items():
+			total += n_ways * safe_comb(unexposed_tiles, bombs_left - bombs)
+			unexposed_weight += n_ways * safe_comb(unexposed_tiles - 1, bombs_left - bombs - 1)
+
+		weights = {}
+		for i, (tiles, constraints) in enumerate(components):
+			others = Board.convolve(prefix[i], suffix[i+1], bombs_left)
+			for bombs, (n_ways, bomb_counts) in counts[i].items():
+				factor = sum([n_others * safe_comb(unexposed_tiles, bombs_left - bombs - other_bombs) for other_bombs, n_others in others.items()])
+				for j, tile in enumerate(tiles):
+					weights[tile.coords] = weights.get(tile.coords, 0) + bomb_counts[j] * factor
+		return weights, unexposed_weight, total
+
+	@staticmethod
+	def convolve(ways_1, ways_2, max_total):
+		"""Combine two dictionaries of (number of bombs: number of ways) into the number of ways to place each total (up to max_total)."""
+		combined = {}
+		for bombs_1, n_ways_1 in ways_1.items():
+			for bombs_2, n_ways_2 in ways_2.items():
+				if bombs_1 + bombs_2 <= max_total:
+					combined[bombs_1 + bombs_2] = combined.get(bombs_1 + bombs_2, 0) + n_ways_1 * n_ways_2
+		return combined
+
+	def count_configurations(self, tiles, constraints, max_total):
+		"""
+		Count the configurations of a component (see get_components) without storing them.
+		@param tiles: the exposed tiles of the component
+		@param constraints: the numbered tiles around them
+		@param max_total: the most bombs the component can hold
+		@return a dictionary mapping each possible number of bombs in the component to a tuple (ways, bomb_counts)
+		where ways is the number of configurations with that many bombs and bomb_counts[j] is the number of them in which tiles[j] is a bomb.
+		"""
+		index = dict([(tile, j) for j, tile in enumerate(tiles)])
+
+		# For every number: the bombs it still needs, how many of them are placed and how many of its tiles are unassigned
+		needed = []
+		placed = []
+		unknowns = []
+		tile_constraints = [[] for tile in tiles]
+		for constraint in constraints:
+			needed.append(constraint.num)
+			placed.append(0)
+			unknowns.append(0)
+			for neighbor in constraint.surrounding_bombs(mode=3):
+				if neighbor.is_flagged:
+					needed[-1] -= 1
+				elif neighbor in index:
+					unknowns[-1] += 1
+					tile_constraints[index[neighbor]].append(len(needed) - 1)
+
+		counts = {}
+		assignment = [False] * len(tiles)
+		order = constraint_order(tile_constraints)
+
+		def assign(depth, bomb_total):
+			self.nodes_explored += 1
+			if self.budget != None:
+				self.check_budget()
+			if depth == len(tiles):
+				n_ways, bomb_counts = counts.get(bomb_total, (0, [0] * len(tiles)))
+				for j in range(len(tiles)):
+					if assignment[j]:
+						bomb_counts[j] += 1
+				counts[bomb_total] = (n_ways + 1, bomb_counts)
+				return
+			j = order[depth]
+			for is_bomb in (True, False):
+				if is_bomb and bomb_total == max_total:
+					continue
+				valid = True
+				for k in tile_constraints[j]:
+					unknowns[k] -= 1
+					if is_bomb:
+						placed[k] += 1
+					if placed[k] > needed[k] or placed[k] + unknowns[k] < needed[k]:
+						valid = False
+				if valid:
+					assignment[j] = is_bomb
+					assign(depth + 1, bomb_total + (1 if is_bomb else 0))
+				for k in tile_constraints[j]:
+					unknowns[k] += 1
+					if is_bomb:
+						placed[k] -= 1
+			assignment[j] = False
+
+		assign(0, 0)
+		return counts
+
+	def quick_solve_state(self):
+		"""Use the most basic Minesweeper rules (satisfaction and requirement) to find a single change (if one can be found)"""
+		return self.apply_first_group(self.get_quick_moves())
+
+	def subset_solve_state(self):
+		"""Compare pairs of overlapping numbered tiles to find a single change (if one can be found) without enumerating
+		configurations (see get_subset_moves)."""
+		return self.apply_first_group(self.get_subset_moves())
 
 	def get_configurations(self):
 		"""Returns a list of all the possible configurations for the exposed tiles as lists of bombs represented as True and non-bombs represented as False like so:
@@ -464,60 +1127,223 @@ class Board:
 			blank_configuration[tile.coords] = None
 
 		# Call recursive helper function
-		return self.get_configurations_helper(blank_configuration, depth=0)
+		configurations = self.get_configurations_helper(blank_configuration)
+		if self.stats != None:
+			self.stats.record_configurations(len(configurations))
+		return configurations
 
-	def get_configurations_helper(self, configuration, depth=0):
-		"""Helper function for get_configurations that will be called recursively.
+	def get_components(self):
+		"""Split the exposed tiles into independent components.
+		Two exposed tiles are in the same component if they share a numbered neighbor (directly or through
+		other exposed tiles), so the bombs in one component never affect the numbers around another.
+		@return a list of (tiles, constraints) tuples where tiles is a list of the exposed tiles in the component
+		(in board order) and constraints is a list of the numbered tiles that touch them."""
+		exposed_tiles = self.get_exposed_tiles(includeFlagged=False)
+		exposed_set = set(exposed_tiles)
+		component_of = {}
+		components = []
+		for start_tile in exposed_tiles:
+			if start_tile in component_of:
+				continue
+			tiles = set()
+			constraints = set()
+			stack = [start_tile]
+			component_of[start_tile] = len(components)
+			while stack:
+				tile = stack.pop()
+				tiles.add(tile)
+				for neighbor in tile.surrounding_bombs(mode=3):
+					if neighbor.is_revealed and neighbor.num > 0 and neighbor not in constraints:
+						constraints.add(neighbor)
+						for linked_tile in neighbor.surrounding_bombs(mode=3):
+							if linked_tile in exposed_set and linked_tile not in component_of:
+								component_of[linked_tile] = len(components)
+								stack.append(linked_tile)
+			components.append(([tile for tile in exposed_tiles if tile in tiles], sorted(constraints, key=lambda tile: (tile.y, tile.x))))
+		return components
+
+	def get_component_configurations(self):
+		"""Enumerate the configurations of every independent component of the exposed tiles on its own
+		and combine them only through the number of bombs left on the board.
+		@return a tuple (component_configurations, totals):
+
+			- component_configurations: a list with, for every component, the list of its configurations
+			  (formatted as in get_configurations) that are part of at least one valid whole-board configuration.
+			  The configurations are shared with component_cache and must not be changed.
+			- totals: the set of possible numbers of bombs on all exposed tiles combined.
+			  This is empty if no valid configuration exists.
+		"""
+		components = self.get_components()
+		component_configurations = []
+		for tiles, constraints in components:
+			# A component's configurations only depend on its numbers, so a component a reveal or flag didn't touch is reused
+			key = self.get_component_key(constraints)
+			configurations = self.component_cache.get(key)
+			if configurations == None:
+				blank_configuration = {}
+				for tile in tiles:
+					blank_configuration[tile.coords] = None
+				# The board-wide bounds depend on the rest of the board, they are applied through the totals below
+				configurations = self.get_configurations_helper(blank_configuration, constraints=constraints, check_totals=False)
+				self.component_cache[key] = configurations
+				if len(self.component_cache) > self.component_cache_size:
+					self.component_cache.popitem(last=False)
+				if self.stats != None:
+					self.stats.cache_misses += 1
+			else:
+				self.component_cache.move_to_end(key)
+				if self.stats != None:
+					self.stats.cache_hits += 1
+			component_configurations.append(configurations)
+		if self.stats != None:
+			self.stats.record_configurations(sum([len(configurations) for configurations in component_configurations]))
+
+		# Bombs on exposed tiles must leave between 0 and (unexposed unrevealed tiles) bombs for the rest of the board
+		unexposed_tiles = self.width * self.height - self.n_revealed - sum([len(tiles) for tiles, constraints in components])
+		min_total = self.bomb_count - unexposed_tiles
+		max_total = self.bomb_count - self.n_flagged_by_solver
+		bomb_counts = [set([list(configuration.values()).count(True) for configuration in configurations]) for configurations in component_configurations]
+
+		# Only keep the configurations that can be combined with the other components into a valid total
+		for i, configurations in enumerate(component_configurations):
+			other_totals = Board.get_possible_totals(bomb_counts[:i] + bomb_counts[i+1:], max_total)
+			component_configurations[i] = [
+				configuration for configuration in configurations
+				if any(min_total <= list(configuration.values()).count(True) + total <= max_total for total in other_totals)
+			]
+		totals = set([total for total in Board.get_possible_totals(bomb_counts, max_total) if total >= min_total])
+		return component_configurations, totals
+
+	def get_component_key(self, constraints):
+		"""Return the key component_cache stores the configurations of the component around constraints (the numbered tiles
+		from get_components) under: every number with the bombs it still needs and its unrevealed, unflagged neighbors."""
+		key = []
+		for constraint in constraints:
+			needed = constraint.num
+			unknowns = []
+			for neighbor in constraint.surrounding_bombs(mode=3):
+				if neighbor.is_flagged:
+					needed -= 1
+				elif not neighbor.is_revealed:
+					unknowns.append(neighbor.coords)
+			key.append((constraint.coords, needed, tuple(unknowns)))
+		return tuple(key)
+
+	@staticmethod
+	def get_possible_totals(bomb_counts, max_total):
+		"""Return the set of every sum (up to max_total) that can be made by picking one number from each of the sets in bomb_counts."""
+		totals = {0}
+		for counts in bomb_counts:
+			totals = set([total + count for total in totals for count in counts if total + count <= max_total])
+		return totals
+
+	def get_configurations_helper(self, configuration, depth=None, constraints=None, check_totals=True):
+		"""Find every configuration that completes the given one.
+		Every assignment is checked the same way as is_valid_configuration, but against running counts (bombs placed and
+		unassigned tiles around every number, bombs placed on the board and tiles that can still hold a bomb) that are
+		updated on assign and undo, so a search node costs O(neighbors) instead of O(board).
 		@param configuration: A base configuration dictionary with the keys being the exposed tiles and the values being either True or False or None.
 			- True: The tile is a bomb
 			- False: The tile is not a bomb
 			- None: The tile has not been assigned a value yet.
+		@param depth (optional): deprecated and ignored, the search keeps its own depth
+		@param constraints (optional): the numbered tiles to check the configuration against, defaults to every numbered tile
+		@param check_totals (optional): also check the bombs against the board-wide bounds (not too many bombs on the board,
+			enough unrevealed tiles for the bombs left). Without them the result only depends on the numbers in constraints.
 		@return a list of all *possible* configurations."""
-
-		# Draw config discovery
-		if __name__ == "__main__":
-			for tile, value in configuration.items():
-				if value == True:
-					self.tiles[tile[1]][tile[0]].is_bomb_in_config = True
-					self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = False
-				elif value == False:
-					self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = True
-					self.tiles[tile[1]][tile[0]].is_bomb_in_config = False
-				else:
-					self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = False
-					self.tiles[tile[1]][tile[0]].is_bomb_in_config = False
-				self.tiles[tile[1]][tile[0]].needs_update = True
-			self.draw()
-			pg.display.update()
-			clock.tick()
-
-		# Base case
-		if None not in configuration.values():
-			return [configuration]
-
-		# Recursive case
+		if depth != None:
+			warnings.warn('the depth argument of get_configurations_helper is ignored and will be removed', DeprecationWarning, stacklevel=2)
+		if constraints == None:
+			constraints = self.nummed_tiles
+		configuration = configuration.copy() # Assigned in place and copied for every configuration found
+
+		# Board-wide counts, see is_valid_configuration
+		n_bombs = list(configuration.values()).count(True) + self.n_flagged_by_solver
+		potential_bomb_tiles = 0
+		for tile in self.get_all_tiles():
+			if not tile.is_revealed and configuration.get(tile.coords) != False:
+				potential_bomb_tiles += 1
+
+		# For every number: the bombs placed around it and its unassigned tiles
+		nums = []
+		placed = []
+		unknowns = []
+		tile_constraints = dict([(coords, []) for coords in configuration])
+		for constraint in constraints:
+			nums.append(constraint.num)
+			placed.append(0)
+			unknowns.append(0)
+			for neighbor in constraint.surrounding_bombs(mode=3):
+				if neighbor.coords in configuration:
+					tile_constraints[neighbor.coords].append(len(nums) - 1)
+					if configuration[neighbor.coords] == True:
+						placed[-1] += 1
+					elif configuration[neighbor.coords] == None:
+						unknowns[-1] += 1
+				elif neighbor.is_flagged:
+					placed[-1] += 1
+		n_violated = sum([1 for k in range(len(nums)) if placed[k] > nums[k] or placed[k] + unknowns[k] < nums[k]])
+
+		unassigned = [key for key in configuration if configuration[key] == None]
+		unassigned = [unassigned[j] for j in constraint_order([tile_constraints[key] for key in unassigned])]
 		configurations = []
 
-		# Find the first key with a value of None
-		for key in configuration:
-			if configuration[key] == None:
-				break
-
-		# Add a configuration with the key being True if it is a valid configuration
-		configuration_copy_1 = configuration.copy()
-		configuration_copy_1[key] = True
-		if self.is_valid_configuration(configuration_copy_1):
-			configurations += self.get_configurations_helper(configuration_copy_1, depth=depth+1)
-
-		# Add a configuration with the key being False if it is a valid configuration
-		configuration_copy_2 = configuration.copy()
-		configuration_copy_2[key] = False
-		if self.is_valid_configuration(configuration_copy_2):
-			configurations += self.get_configurations_helper(configuration_copy_2, depth=depth+1)
-
+		def set_value(key, value, change):
+			"""Add (change = 1) or remove (change = -1) the assignment of value to key from the running counts."""
+			nonlocal n_bombs, potential_bomb_tiles, n_violated
+			if value:
+				n_bombs += change
+			else:
+				potential_bomb_tiles -= change
+			for k in tile_constraints[key]:
+				was_violated = placed[k] > nums[k] or placed[k] + unknowns[k] < nums[k]
+				unknowns[k] -= change
+				if value:
+					placed[k] += change
+				is_violated = placed[k] > nums[k] or placed[k] + unknowns[k] < nums[k]
+				n_violated += is_violated - was_violated
+
+		def assign(i):
+			self.nodes_explored += 1
+			if self.budget != None:
+				self.check_budget()
+
+			# Draw config discovery (only as often as the visualizer allows, nothing at all when headless)
+			if self.visualizer != None and self.visualizer.is_due():
+				for tile, value in configuration.items():
+					if value == True:
+						self.tiles[tile[1]][tile[0]].is_bomb_in_config = True
+						self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = False
+					elif value == False:
+						self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = True
+						self.tiles[tile[1]][tile[0]].is_bomb_in_config = False
+					else:
+						self.tiles[tile[1]][tile[0]].is_non_bomb_in_config = False
+						self.tiles[tile[1]][tile[0]].is_bomb_in_config = False
+					self.tiles[tile[1]][tile[0]].needs_update = True
+				self.visualizer.show(self)
+
+			# Base case
+			if i == len(unassigned):
+				configurations.append(configuration.copy())
+				return
+
+			# Try the next unassigned tile (in constraint order) as a bomb and as a non-bomb, going deeper when the configuration is still valid
+			key = unassigned[i]
+			for value in (True, False):
+				configuration[key] = value
+				set_value(key, value, 1)
+				if self.stats != None:
+					self.stats.validity_checks += 1
+				if n_violated == 0 and (not check_totals or n_bombs <= self.bomb_count and potential_bomb_tiles >= self.bomb_count):
+					assign(i + 1)
+				set_value(key, value, -1)
+			configuration[key] = None
+
+		assign(0)
 		return configurations
 
-	def is_valid_configuration(self, configuration):
+	def is_valid_configuration(self, configuration, constraints=None):
 		"""
 		Return False if 'configuration' is illegal given the current board state.
 		@param configuration: A dictionary with the keys being the exposed tiles and the values being either True or False or None:
@@ -525,8 +1351,12 @@ class Board:
 			- True: The tile is supposed to be a bomb
 			- False: The tile is supposed to not be a bomb
 			- None: The tile has value has not been assigned yet
+		@param constraints (optional): the numbered tiles to check, defaults to every numbered tile.
+			Pass the numbered tiles around a component when 'configuration' only covers that component.
 		@return bool True if the configuration is valid, False if it is not.
 		"""
+		if self.stats != None:
+			self.stats.validity_checks += 1
 
 		# Check if there are more bombs than the board allows
 		if list(configuration.values()).count(True) + self.n_flagged_by_solver > self.bomb_count:
@@ -548,7 +1378,9 @@ class Board:
 			return False
 
 		# Check all numbered tiles
-		for tile in self.nummed_tiles:
+		if constraints == None:
+			constraints = self.nummed_tiles
+		for tile in constraints:
 			bombs_around_tile = 0
 			unknowns_around_tile = 0
 			surrounding_tiles = tile.surrounding_bombs(mode=3)
@@ -576,13 +1408,19 @@ class Board:
 
 class Tile:
 
+	__slots__ = (
+		'board', 'coords', 'x', 'y', 'is_bomb', '_is_flagged', 'is_revealed', 'is_found', 'num',
+		'is_bomb_in_config', 'is_non_bomb_in_config', '_needs_update', 'n_unknown'
+	)
+
 	def __init__(self,board,coords):
 		self.board = board
 		self.coords = coords
 		self.is_bomb = False
-		self.is_flagged = False
+		self._is_flagged = False
 		self.is_revealed = False
 		self.is_found = False
+		self.num = 0 # Number of bombs around the tile (0 for bombs), set by Board.compute_nums
 
 		# The below two flags are for visualizing the solving process.
 		# They will be set to True when this tile is being considered as a bomb in the
@@ -595,9 +1433,38 @@ class Tile:
 		self.needs_update = True
 		self.x = coords[0]
 		self.y = coords[1]
+		self.n_unknown = self.count_neighbors() # Number of unrevealed, unflagged neighbors, kept up to date by the board
+
+	def count_neighbors(self):
+		"""Return the number of tiles around this tile (less than 8 on edges and corners)."""
+		columns = min(self.x + 1, self.board.width - 1) - max(self.x - 1, 0) + 1
+		rows = min(self.y + 1, self.board.height - 1) - max(self.y - 1, 0) + 1
+		return columns * rows - 1
+
+	@property
+	def is_flagged(self):
+		return self._is_flagged
+
+	@is_flagged.setter
+	def is_flagged(self, value):
+		if value != self._is_flagged:
+			self._is_flagged = value
+			self.board.n_flagged += 1 if value else -1
+			self.board.update_unsatisfied(self)
+
+	@property
+	def needs_update(self):
+		return self._needs_update
+
+	@needs_update.setter
+	def needs_update(self, value):
+		self._needs_update = value
+		if value and self.board.dirty_tiles != None:
+			self.board.dirty_tiles.add(self.coords)
 
 	def draw(self):
-		"""Draws a tile to the screen."""
+		"""Draws a tile to the screen.
+		@return the rectangle of the screen that was drawn on"""
 		x = (self.x + 1) * margin_length + tile_length * self.x
 		y = (self.y + 1) * margin_length + tile_length * self.y
 		#TEMPORARY
@@ -620,7 +1487,8 @@ class Tile:
 			color = dark_green
 		else:
 			color = grey
-		pg.draw.rect(screen, color, (x,y, tile_length, tile_length))
+		msg = None
+		font_color = None
 		if self.is_revealed and self.num != 0 or self.is_flagged and not self.is_bomb and self.board.lose:
 			if self.is_flagged and not self.is_bomb and self.board.lose:
 				msg = 'X'
@@ -628,10 +1496,9 @@ class Tile:
 			else:
 				msg = self.num
 				font_color = tile_colors[self.num]
-			font = pg.font.SysFont("Arial", int(7/6 * tile_length))
-			text = font.render(str(msg), True, font_color)
-			screen.blit(text,(int(x + 0.25*tile_length), int(y - 0.15*tile_length)))
+		screen.blit(get_tile_surface(color, msg, font_color), (x, y))
 		self.needs_update = False
+		return pg.Rect(x, y, tile_length, tile_length)
 		#/TEMPORARY
 
 	def activate(self, button):
@@ -651,6 +1518,7 @@ class Tile:
 				self.is_flagged = not self.is_flagged
 				if self.is_bomb:
 					self.is_found = not self.is_found
+					self.board.n_found += 1 if self.is_found else -1
 			elif button == 1: # Left click
 					self.reveal()
 			elif button == 2: # Middle click
@@ -661,19 +1529,24 @@ class Tile:
 
 	def reveal(self):
 		"""What to do when someone reveals (left click) a
-		tile or the sytem reveals a tile."""
-		if not self.is_flagged:
-			self.needs_update = True
-			self.is_revealed = True
-			if self.is_bomb:
-				self.board.lose = True
-				self.num = 0
+		tile or the sytem reveals a tile.
+		Tiles around 0 tiles are opened with a stack instead of recursion so big empty areas can't hit the recursion limit."""
+		tiles = [self]
+		while tiles:
+			tile = tiles.pop()
+			if tile._is_flagged or tile.is_revealed:
+				continue
+			tile.needs_update = True
+			tile.is_revealed = True
+			tile.board.n_revealed += 1
+			neighbors = tile.surrounding_bombs(mode=3)
+			tile.board.update_frontier(tile, neighbors)
+			if tile.is_bomb:
+				tile.board.lose = True
+			elif tile.num == 0:
+				tiles.extend(neighbors)
 			else:
-				self.num = self.surrounding_bombs(mode=1)
-				if self.num == 0:
-					self.surrounding_bombs(mode=2)
-				else:
-					self.board.nummed_tiles.append(self)
+				tile.board.nummed_tiles.append(tile)
 
 	def first_reveal(self):
 		"""A function for when the user first reveals a tile.
@@ -697,6 +1570,11 @@ class Tile:
 		Mode 1: Returns the number of bombs immediately surrounding the tile.
 		Mode 2: Reveals the surrounding tiles.
 		Mode 3: Return the surrounding tiles (a list of Tile-object instances)."""
+		if mode == 3:
+			# Fast path, this is called for every tile that gets revealed
+			rows = self.board.tiles[max(self.y - 1, 0):self.y + 2]
+			left = max(self.x - 1, 0)
+			return [tile for row in rows for tile in row[left:self.x + 2] if tile is not self]
 		key = [[-1, -1], [-1, 0], [-1, 1], [0, -1], [0, 1], [1, -1], [1, 0], [1, 1]]
 		bomb_count = 0
 		tiles = []
@@ -720,6 +1598,1067 @@ class Tile:
 			return bomb_count
 
 
+def cell_flag(bit):
+	"""Return a property for a CompactTile that reads and writes one bit of the tile's entry in board.cell_flags."""
+	def get(self):
+		return self.board.cell_flags[self.index] & bit != 0
+
+	def set(self, value):
+		if value:
+			self.board.cell_flags[self.index] |= bit
+		else:
+			self.board.cell_flags[self.index] &= ~bit
+	return property(get, set)
+
+
+class CompactTile(Tile):
+	"""
+	A tile of a compact board (see Board), which is only a view of the tile's entries in the board's flat arrays:
+	a byte of bits in board.cell_flags, its number in board.cell_nums and its unknown neighbor count in board.cell_unknowns.
+	Views are created whenever a tile is asked for, so two views of the same tile are equal (and hash the same)
+	without being the same object.
+	"""
+
+	__slots__ = ('index',) # y * width + x
+
+	BOMB = 1
+	FLAGGED = 2
+	REVEALED = 4
+	FOUND = 8
+	BOMB_IN_CONFIG = 16
+	NON_BOMB_IN_CONFIG = 32
+	NEEDS_UPDATE = 64
+
+	def __init__(self, board, index):
+		self.board = board
+		self.index = index
+
+	def __eq__(self, other):
+		return isinstance(other, CompactTile) and self.index == other.index and self.board is other.board
+
+	def __hash__(self):
+		return self.index
+
+	is_bomb = cell_flag(BOMB)
+	_is_flagged = cell_flag(FLAGGED)
+	is_revealed = cell_flag(REVEALED)
+	is_found = cell_flag(FOUND)
+	is_bomb_in_config = cell_flag(BOMB_IN_CONFIG)
+	is_non_bomb_in_config = cell_flag(NON_BOMB_IN_CONFIG)
+	_needs_update = cell_flag(NEEDS_UPDATE)
+
+	@property
+	def x(self):
+		return self.index % self.board.width
+
+	@property
+	def y(self):
+		return self.index // self.board.width
+
+	@property
+	def coords(self):
+		return (self.index % self.board.width, self.index // self.board.width)
+
+	@property
+	def num(self):
+		return self.board.cell_nums[self.index]
+
+	@num.setter
+	def num(self, value):
+		self.board.cell_nums[self.index] = value
+
+	@property
+	def n_unknown(self):
+		return self.board.cell_unknowns[self.index]
+
+	@n_unknown.setter
+	def n_unknown(self, value):
+		self.board.cell_unknowns[self.index] = value
+
+	def surrounding_bombs(self, mode=1):
+		if mode != 3:
+			return Tile.surrounding_bombs(self, mode)
+		board = self.board
+		width = board.width
+		x = self.index % width
+		y = self.index // width
+		columns = range(max(x - 1, 0), min(x + 2, width))
+		return [
+			CompactTile(board, row * width + column)
+			for row in range(max(y - 1, 0), min(y + 2, board.height)) for column in columns
+			if row != y or column != x
+		]
+
+
+class TileRow:
+	"""A row of board.tiles on a compact board, creating CompactTile views when indexed or iterated."""
+
+	__slots__ = ('board', 'y')
+
+	def __init__(self, board, y):
+		self.board = board
+		self.y = y
+
+	def __len__(self):
+		return self.board.width
+
+	def __getitem__(self, x):
+		if isinstance(x, slice):
+			return [CompactTile(self.board, self.y * self.board.width + column) for column in range(*x.indices(self.board.width))]
+		if x < 0:
+			x += self.board.width
+		if not 0 <= x < self.board.width:
+			raise IndexError('tile index out of range')
+		return CompactTile(self.board, self.y * self.board.width + x)
+
+	def __iter__(self):
+		return iter(self[:])
+
+
+class TileGrid:
+	"""board.tiles on a compact board: works like the list of rows of tiles of a normal board."""
+
+	__slots__ = ('board',)
+
+	def __init__(self, board):
+		self.board = board
+
+	def __len__(self):
+		return self.board.height
+
+	def __getitem__(self, y):
+		if isinstance(y, slice):
+			return [TileRow(self.board, row) for row in range(*y.indices(self.board.height))]
+		if y < 0:
+			y += self.board.height
+		if not 0 <= y < self.board.height:
+			raise IndexError('row index out of range')
+		return TileRow(self.board, y)
+
+	def __iter__(self):
+		return iter(self[:])
+
+
+class ChunkedBoard(Board):
+	"""
+	A board whose tiles are only created a chunk (chunk_size x chunk_size tiles) at a time, the first time a tile of the chunk
+	is revealed or looked at by the solver, so even a board of millions by millions of tiles starts in constant time.
+	The bombs of a chunk come from a random generator seeded with (board_seed, chunk coordinates) alone, so the layout is
+	the same whatever order the chunks are created in. Every chunk holds int(its tiles * bomb_percentage / 100) bombs
+	(fewer if the first tile's opening leaves no room), which is how bomb_count is known without creating any chunk.
+
+	Everything the solver does on the frontier only creates the chunks it touches. Board-wide operations
+	(get_all_tiles, draw, get_probabilities...) create every chunk.
+	"""
+
+	def __init__(self, width, height, bomb_percentage, first_tile, chunk_size=16, board_seed=None):
+		"""
+		@param first_tile: coordinates of the first tile, which is revealed right away (it and its neighbors are never bombs)
+		@param board_seed (optional): seed of the layout, a random one is picked if None
+		"""
+		self.chunk_size = chunk_size
+		self.chunks = {} # Chunk coordinates to the rows of Tiles of the chunk
+		self.chunk_bombs = {} # Chunk coordinates to the set of bomb coordinates in the chunk
+		Board.__init__(self, width, height, bomb_percentage, board_seed=board_seed)
+		self.first_tile = first_tile
+		self.opening = set([(x, y) for x in range(first_tile[0] - 1, first_tile[0] + 2) for y in range(first_tile[1] - 1, first_tile[1] + 2)])
+		self.bomb_count = self.count_bombs()
+		self.tiles[first_tile[1]][first_tile[0]].reveal()
+		self.pre_reveal = False
+
+	def get_chunk_bounds(self, chunk_x, chunk_y):
+		"""Return the (left, top, right, bottom) tile coordinates of a chunk, right and bottom excluded."""
+		left = chunk_x * self.chunk_size
+		top = chunk_y * self.chunk_size
+		return left, top, min(left + self.chunk_size, self.width), min(top + self.chunk_size, self.height)
+
+	def get_chunk_bomb_count(self, width, height):
+		"""Return the number of bombs in a chunk of width x height tiles."""
+		return int(width * height * self.bomb_percentage / 100)
+
+	def count_bombs(self):
+		"""Return the number of bombs on the whole board, only looking at the chunks that overlap the first tile's opening."""
+		full_columns, last_width = divmod(self.width, self.chunk_size)
+		full_rows, last_height = divmod(self.height, self.chunk_size)
+		bomb_count = 0
+		for chunk_width, n_columns in ((self.chunk_size, full_columns), (last_width, 1 if last_width else 0)):
+			for chunk_height, n_rows in ((self.chunk_size, full_rows), (last_height, 1 if last_height else 0)):
+				bomb_count += n_columns * n_rows * self.get_chunk_bomb_count(chunk_width, chunk_height)
+		# The opening can leave a small chunk too little room for its share of the bombs
+		opening_chunks = set([(x // self.chunk_size, y // self.chunk_size) for x, y in self.opening if 0 <= x < self.width and 0 <= y < self.height])
+		for chunk_x, chunk_y in opening_chunks:
+			left, top, right, bottom = self.get_chunk_bounds(chunk_x, chunk_y)
+			bomb_count += len(self.get_bombs_of_chunk(chunk_x, chunk_y)) - self.get_chunk_bomb_count(right - left, bottom - top)
+		return bomb_count
+
+	def get_bombs_of_chunk(self, chunk_x, chunk_y):
+		"""Return the set of coordinates of the bombs in a chunk, without creating its tiles."""
+		key = (chunk_x, chunk_y)
+		if key not in self.chunk_bombs:
+			left, top, right, bottom = self.get_chunk_bounds(chunk_x, chunk_y)
+			cells = [(x, y) for y in range(top, bottom) for x in range(left, right) if (x, y) not in self.opening]
+			n_bombs = min(self.get_chunk_bomb_count(right - left, bottom - top), len(cells))
+			self.chunk_bombs[key] = set(Random(f'{self.board_seed}/{chunk_x}/{chunk_y}').sample(cells, n_bombs))
+		return self.chunk_bombs[key]
+
+	def is_bomb_at(self, x, y):
+		return (x, y) in self.get_bombs_of_chunk(x // self.chunk_size, y // self.chunk_size)
+
+	def get_chunk(self, chunk_x, chunk_y):
+		"""Return the rows of Tiles of a chunk, creating them (with their bombs and numbers) the first time."""
+		key = (chunk_x, chunk_y)
+		if key not in self.chunks:
+			left, top, right, bottom = self.get_chunk_bounds(chunk_x, chunk_y)
+			bombs = self.get_bombs_of_chunk(chunk_x, chunk_y)
+			rows = []
+			for y in range(top, bottom):
+				rows.append([])
+				for x in range(left, right):
+					tile = Tile(self, (x, y))
+					tile.is_bomb = (x, y) in bombs
+					if not tile.is_bomb:
+						tile.num = sum([
+							1 for neighbor_y in range(max(y - 1, 0), min(y + 2, self.height))
+							for neighbor_x in range(max(x - 1, 0), min(x + 2, self.width))
+							if self.is_bomb_at(neighbor_x, neighbor_y)
+						])
+					rows[-1].append(tile)
+			self.chunks[key] = rows
+		return self.chunks[key]
+
+	def get_tile(self, x, y):
+		return self.get_chunk(x // self.chunk_size, y // self.chunk_size)[y % self.chunk_size][x % self.chunk_size]
+
+	def get_all_tiles(self):
+		"""Return a list of all tiles on the board (creating every chunk)."""
+		return [tile for row in self.tiles for tile in row]
+
+	def create_tiles(self):
+		self.tiles = ChunkGrid(self)
+
+	def add_bombs(self, mainSafeTile):
+		raise TypeError('the bombs of a ChunkedBoard come from its seed and are placed when it is created')
+
+	def compute_nums(self):
+		pass # Every chunk computes its numbers when it is created
+
+	def relocate_bombs(self, count=1):
+		raise TypeError('the bombs of a ChunkedBoard come from its seed and can not be moved')
+
+	def make_solvable(self, max_repairs=None, bombs_per_repair=1, time_limit=None, max_nodes=None):
+		"""Not supported: repairing moves bombs (see relocate_bombs), so this raises TypeError before solving anything."""
+		raise TypeError('a ChunkedBoard can not be repaired, its bombs come from its seed and can not be moved')
+
+	def reset(self):
+		"""Reset the board to its initial state by dropping every chunk, they are created again from the seed when needed."""
+		self.chunks = {}
+		self.nummed_tiles = []
+		self.frontier = set()
+		self.unsatisfied_tiles = {}
+		self.n_revealed = 0
+		self.n_flagged = 0
+		self.n_found = 0
+		self.win = False
+		self.lose = False
+		self.tiles[self.first_tile[1]][self.first_tile[0]].reveal()
+		self.n_flagged_by_solver = 0
+
+
+class ChunkRow:
+	"""A row of board.tiles on a ChunkedBoard, creating the chunks of the tiles it is asked for."""
+
+	__slots__ = ('board', 'y')
+
+	def __init__(self, board, y):
+		self.board = board
+		self.y = y
+
+	def __len__(self):
+		return self.board.width
+
+	def __getitem__(self, x):
+		if isinstance(x, slice):
+			return [self.board.get_tile(column, self.y) for column in range(*x.indices(self.board.width))]
+		if x < 0:
+			x += self.board.width
+		if not 0 <= x < self.board.width:
+			raise IndexError('tile index out of range')
+		return self.board.get_tile(x, self.y)
+
+	def __iter__(self):
+		return iter(self[:])
+
+
+class ChunkGrid:
+	"""board.tiles on a ChunkedBoard: works like the list of rows of tiles of a normal board."""
+
+	__slots__ = ('board',)
+
+	def __init__(self, board):
+		self.board = board
+
+	def __len__(self):
+		return self.board.height
+
+	def __getitem__(self, y):
+		if isinstance(y, slice):
+			return [ChunkRow(self.board, row) for row in range(*y.indices(self.board.height))]
+		if y < 0:
+			y += self.board.height
+		if not 0 <= y < self.board.height:
+			raise IndexError('row index out of range')
+		return ChunkRow(self.board, y)
+
+	def __iter__(self):
+		return iter(self[:])
+
+
+class SolverBackend:
+	"""An engine that Board.solve_state can use, once the quick rules are stuck, to find which exposed tiles are
+	definitely bombs and which definitely aren't. Subclass it and implement get_deductions to plug in a new engine."""
+
+	name = None
+
+	def get_deductions(self, board):
+		"""
+		@param board: the Board to look at, which must not be changed
+		@return None if no configuration fits the board, otherwise a tuple (safe_tiles, bomb_tiles, unexposed_safe):
+
+			- safe_tiles: the exposed tiles that are never a bomb
+			- bomb_tiles: the exposed tiles that are always a bomb
+			- unexposed_safe: True if every bomb left has to be on an exposed tile
+		"""
+		raise NotImplementedError
+
+
+class EnumerationBackend(SolverBackend):
+	"""Enumerate every configuration of every component (see Board.get_component_configurations). This is the default."""
+
+	name = 'enumerate'
+
+	def get_deductions(self, board):
+		component_configurations, totals = board.get_component_configurations()
+		if not totals:
+			return None
+
+		# Determine which tiles are ALWAYS bombs and which are ALWAYS not bombs
+		master_configuration = {}
+		for configurations in component_configurations:
+			component_master = configurations[0].copy()
+			for configuration in configurations[1:]:
+				for key in configuration:
+					if configuration[key] != component_master[key]:
+						component_master[key] = None
+			master_configuration.update(component_master)
+		safe_tiles = [board.tiles[y][x] for (x, y), is_bomb in master_configuration.items() if is_bomb == False]
+		bomb_tiles = [board.tiles[y][x] for (x, y), is_bomb in master_configuration.items() if is_bomb]
+		return safe_tiles, bomb_tiles, totals == {board.bomb_count - board.n_flagged_by_solver}
+
+
+class ProbabilityBackend(SolverBackend):
+	"""Count the weighted configurations instead of storing them (see Board.get_bomb_weights)."""
+
+	name = 'probability'
+
+	def get_deductions(self, board):
+		weights, unexposed_weight, total = board.get_bomb_weights()
+		if total == 0:
+			return None
+		safe_tiles = [board.tiles[y][x] for (x, y), weight in weights.items() if weight == 0]
+		bomb_tiles = [board.tiles[y][x] for (x, y), weight in weights.items() if weight == total]
+		return safe_tiles, bomb_tiles, unexposed_weight == 0
+
+
+class DPLLBackend(SolverBackend):
+	"""Encode the exposed tiles as cardinality constraints (one per number plus one for the bombs left) and ask a
+	CardinalitySolver whether each tile can take the value opposite to the one it has in a known solution.
+	A tile is safe when "the constraints plus 'this tile is a bomb'" can't be satisfied, which needs no enumeration."""
+
+	name = 'dpll'
+
+	def get_deductions(self, board):
+		tiles = board.get_exposed_tiles(includeFlagged=False)
+		index = dict([(tile, i) for i, tile in enumerate(tiles)])
+		solver = CardinalitySolver(len(tiles))
+		if board.budget != None:
+			solver.check = lambda: board.check_budget(extra_nodes=solver.nodes)
+		for numbered_tile in board.unsatisfied_tiles:
+			variables = []
+			needed = numbered_tile.num
+			for neighbor in numbered_tile.surrounding_bombs(mode=3):
+				if neighbor.is_flagged:
+					needed -= 1
+				elif neighbor in index:
+					variables.append(index[neighbor])
+			solver.add_constraint(variables, needed, needed)
+
+		# Same bounds on the bombs on the exposed tiles as Board.get_component_configurations
+		unexposed_tiles = board.width * board.height - board.n_revealed - len(tiles)
+		max_total = board.bomb_count - board.n_flagged_by_solver
+		solver.add_constraint(list(range(len(tiles))), board.bomb_count - unexposed_tiles, max_total)
+
+		model = solver.solve()
+		if model == None:
+			board.nodes_explored += solver.nodes
+			return None
+
+		# A value seen in any solution can't be forced, so every solution found rules out more tiles
+		seen = [set([value]) for value in model]
+		safe_tiles = []
+		bomb_tiles = []
+		for i, tile in enumerate(tiles):
+			if len(seen[i]) == 2:
+				continue
+			other_model = solver.solve(assumptions=[(i, not model[i])])
+			if other_model == None:
+				if model[i]:
+					bomb_tiles.append(tile)
+				else:
+					safe_tiles.append(tile)
+			else:
+				for j, value in enumerate(other_model):
+					seen[j].add(value)
+
+		# The unexposed tiles are safe if the exposed tiles can't hold fewer than all the bombs left
+		solver.add_constraint(list(range(len(tiles))), 0, max_total - 1)
+		unexposed_safe = solver.solve() == None
+		board.nodes_explored += solver.nodes
+		return safe_tiles, bomb_tiles, unexposed_safe
+
+
+class CardinalitySolver:
+	"""
+	A DPLL solver for constraints of the form "between lo and hi of these boolean variables are True",
+	with unit propagation, conflict detection and conflict-directed backjumping.
+	"""
+
+	def __init__(self, n_variables):
+		self.n_variables = n_variables
+		self.constraints = [] # (variables, lo, hi) tuples
+		self.variable_constraints = [[] for i in range(n_variables)]
+		self.nodes = 0 # Number of decisions made over every call to solve
+		self.check = None # Called at every decision if set (it can raise to stop the search)
+
+	def add_constraint(self, variables, lo, hi):
+		"""Require between lo and hi (inclusive) of the variables (a list of indices) to be True."""
+		self.constraints.append((variables, lo, hi))
+		for variable in variables:
+			self.variable_constraints[variable].append(len(self.constraints) - 1)
+
+	def solve(self, assumptions=()):
+		"""
+		@param assumptions (optional): a list of (variable, value) pairs that have to hold
+		@return a list with a value for every variable that satisfies all constraints, or None if there is none
+		"""
+		self.values = [None] * self.n_variables
+		self.levels = [0] * self.n_variables
+		self.reasons = [None] * self.n_variables # Constraint that forced the variable, None for decisions and assumptions
+		self.positions = [0] * self.n_variables # Position of the variable on the trail
+		self.trail = []
+		self.n_true = [0] * len(self.constraints)
+		self.n_unassigned = [len(variables) for variables, lo, hi in self.constraints]
+		self.queue = list(range(len(self.constraints)))
+		for variable, value in assumptions:
+			if self.values[variable] == None:
+				self.assign(variable, value, 0, None)
+			elif self.values[variable] != value:
+				return None
+		if self.search(0) != None:
+			return None
+		return list(self.values)
+
+	def assign(self, variable, value, level, reason):
+		self.values[variable] = value
+		self.levels[variable] = level
+		self.reasons[variable] = reason
+		self.positions[variable] = len(self.trail)
+		self.trail.append(variable)
+		for constraint in self.variable_constraints[variable]:
+			self.n_unassigned[constraint] -= 1
+			if value:
+				self.n_true[constraint] += 1
+			self.queue.append(constraint)
+
+	def undo(self, trail_length):
+		"""Unassign every variable assigned after the trail was trail_length long."""
+		while len(self.trail) > trail_length:
+			variable = self.trail.pop()
+			for constraint in self.variable_constraints[variable]:
+				self.n_unassigned[constraint] += 1
+				if self.values[variable]:
+					self.n_true[constraint] -= 1
+			self.values[variable] = None
+		self.queue = []
+
+	def propagate(self, level):
+		"""Assign every variable that a constraint forces.
+		@return the constraint that can no longer be satisfied, or None if there is no conflict."""
+		while self.queue:
+			constraint = self.queue.pop()
+			variables, lo, hi = self.constraints[constraint]
+			n_true = self.n_true[constraint]
+			n_unassigned = self.n_unassigned[constraint]
+			if n_true > hi or n_true + n_unassigned < lo:
+				self.queue = []
+				return constraint
+			if n_unassigned == 0:
+				continue
+			if n_true == hi:
+				forced_value = False
+			elif n_true + n_unassigned == lo:
+				forced_value = True
+			else:
+				continue
+			for variable in variables:
+				if self.values[variable] == None:
+					self.assign(variable, forced_value, level, constraint)
+		return None
+
+	def explain(self, constraint, value=None, position=None):
+		"""Return the set of decision levels that led to constraint failing (or, if value is given, to constraint
+		forcing a variable at trail position 'position' to value)."""
+		variables, lo, hi = self.constraints[constraint]
+		if value == None:
+			# Too many Trues or too many Falses
+			culprit_value = self.n_true[constraint] > hi
+		else:
+			culprit_value = not value
+		levels = set()
+		stack = [variable for variable in variables if self.values[variable] == culprit_value and (position == None or self.positions[variable] < position)]
+		explained = set()
+		while stack:
+			variable = stack.pop()
+			if variable in explained:
+				continue
+			explained.add(variable)
+			reason = self.reasons[variable]
+			if reason == None:
+				if self.levels[variable] > 0:
+					levels.add(self.levels[variable])
+				continue
+			reason_variables, lo, hi = self.constraints[reason]
+			for other in reason_variables:
+				if self.values[other] == (not self.values[variable]) and self.positions[other] < self.positions[variable]:
+					stack.append(other)
+		return levels
+
+	def search(self, level):
+		"""
+		@return None if a solution was found (and is left in self.values), otherwise the set of decision levels
+		responsible for the failure, so the caller can jump back past decisions that had nothing to do with it.
+		"""
+		conflict = self.propagate(level)
+		if conflict != None:
+			return self.explain(conflict)
+		for variable in range(self.n_variables):
+			if self.values[variable] == None:
+				break
+		else:
+			return None
+
+		trail_length = len(self.trail)
+		responsible_levels = set()
+		for value in (True, False):
+			self.nodes += 1
+			if self.check != None:
+				self.check()
+			self.assign(variable, value, level + 1, None)
+			result = self.search(level + 1)
+			if result == None:
+				return None
+			self.undo(trail_length)
+			if level + 1 not in result:
+				# This decision had nothing to do with the failure, so the other value would fail too
+				return result
+			responsible_levels |= result - {level + 1}
+		return responsible_levels
+
+
+solver_backends = dict([(backend.name, backend) for backend in (EnumerationBackend(), ProbabilityBackend(), DPLLBackend())])
+
+
+class BitBoard:
+	"""A compact copy of a board's state that the solver can work on without touching any Tile objects.
+	Every set of tiles (bombs, revealed, flagged...) is a single int where bit (y * width + x) stands for the tile at (x, y),
+	so checking a number is a popcount of two ANDed masks."""
+
+	def __init__(self, width, height):
+		self.width = width
+		self.height = height
+		self.bomb_count = 0
+		self.n_flagged_by_solver = 0
+		self.lose = False
+		self.all_mask = (1 << (width * height)) - 1
+		self.bombs = 0
+		self.revealed = 0
+		self.flagged = 0
+
+		# Masks of every column but the first / last, used to stop shifted bits from wrapping around rows
+		first_column = sum([1 << (y * width) for y in range(height)])
+		self.not_first_column = self.all_mask & ~first_column
+		self.not_last_column = self.all_mask & ~(first_column << (width - 1))
+
+		self.neighbors = [self.dilate(1 << i) & ~(1 << i) for i in range(width * height)]
+		self.nums = [0] * (width * height)
+		self.numbered = 0 # Tiles that are surrounded by > 0 bombs and are not a bomb themselves
+
+	def set_bombs(self, bombs):
+		"""Set the bomb mask and compute the number of every tile once."""
+		self.bombs = bombs
+		self.nums = [popcount(self.neighbors[i] & bombs) for i in range(self.width * self.height)]
+		self.numbered = 0
+		for i, num in enumerate(self.nums):
+			if num > 0:
+				self.numbered |= 1 << i
+		self.numbered &= ~bombs
+
+	def dilate(self, mask):
+		"""Return mask together with every tile that touches a tile in mask."""
+		horizontal = mask | ((mask << 1) & self.not_first_column) | ((mask >> 1) & self.not_last_column)
+		return (horizontal | (horizontal << self.width) | (horizontal >> self.width)) & self.all_mask
+
+	def reveal(self, mask):
+		"""Reveal every tile in mask (flagged tiles are skipped), opening up the neighbors of 0 tiles."""
+		mask &= ~self.flagged & ~self.revealed
+		if mask & self.bombs:
+			self.lose = True
+		while mask:
+			self.revealed |= mask
+			# Tiles around newly revealed 0 tiles get revealed too
+			zeros = mask & ~self.numbered & ~self.bombs
+			mask = self.dilate(zeros) & ~self.revealed & ~self.flagged
+
+	def get_exposed_mask(self):
+		"""Return the mask of all unrevealed, unflagged tiles that are adjacent to revealed tiles."""
+		return self.dilate(self.revealed) & ~self.revealed & ~self.flagged
+
+	def is_solvable(self):
+		"""Solve the state until no more progress can be made.
+		@return True if every tile that is not a bomb has been revealed."""
+		while self.solve_state():
+			pass
+		return popcount(self.all_mask & ~self.revealed) == self.bomb_count
+
+	def solve_state(self):
+		"""Same as Board.solve_state, but on masks.
+		@return True if the state changed, False otherwise."""
+		if self.quick_solve_state():
+			return True
+
+		component_configurations, totals = self.get_component_configurations()
+		if not totals:
+			return False
+		all_bombs_in_exposed_tiles = totals == {self.bomb_count - self.n_flagged_by_solver}
+
+		state_changed = False
+		exposed = 0
+		for component, configurations in component_configurations:
+			exposed |= component
+			always_bombs = component
+			ever_bombs = 0
+			for configuration in configurations:
+				always_bombs &= configuration
+				ever_bombs |= configuration
+			self.flagged |= always_bombs
+			self.n_flagged_by_solver += popcount(always_bombs)
+			never_bombs = component & ~ever_bombs
+			if never_bombs:
+				state_changed = True
+				self.reveal(never_bombs)
+		if all_bombs_in_exposed_tiles:
+			unexposed = self.all_mask & ~self.revealed & ~self.flagged & ~exposed
+			if unexposed:
+				state_changed = True
+				self.reveal(unexposed)
+		return state_changed
+
+	def quick_solve_state(self):
+		"""Same as Board.quick_solve_state, but on masks."""
+		numbered = self.revealed & self.numbered
+		while numbered:
+			i = (numbered & -numbered).bit_length() - 1
+			numbered &= numbered - 1
+			unrevealed = self.neighbors[i] & ~self.revealed
+			possible_bomb_spots = popcount(unrevealed)
+			flagged_spots = popcount(unrevealed & self.flagged)
+			num = self.nums[i]
+
+			# Check if tile requires all neighboring unrevealed tiles to be bombs
+			if possible_bomb_spots == num and flagged_spots < num:
+				self.n_flagged_by_solver += num - flagged_spots
+				self.flagged |= unrevealed
+				return True
+
+			# Check if tile is already satisfied
+			if flagged_spots == num and possible_bomb_spots > num:
+				self.reveal(unrevealed)
+				return True
+		return False
+
+	def get_components(self):
+		"""Same as Board.get_components, but on masks.
+		@return a list of (component, constraints) tuples of masks."""
+		exposed = self.get_exposed_mask()
+		numbers = self.revealed & self.numbered
+		components = []
+		while exposed:
+			component = exposed & -exposed
+			constraints = 0
+			while True:
+				new_constraints = self.dilate(component) & numbers & ~constraints
+				if not new_constraints:
+					break
+				constraints |= new_constraints
+				component |= self.dilate(new_constraints) & exposed
+			components.append((component, constraints))
+			exposed &= ~component
+		return components
+
+	def get_component_configurations(self):
+		"""Same as Board.get_component_configurations, but every configuration is the mask of its bombs.
+		@return a tuple (component_configurations, totals) where component_configurations is a list of
+		(component, configurations) tuples."""
+		components = self.get_components()
+		max_total = self.bomb_count - self.n_flagged_by_solver
+		component_configurations = [self.get_configurations(component, constraints, max_total) for component, constraints in components]
+
+		exposed = 0
+		for component, constraints in components:
+			exposed |= component
+		min_total = self.bomb_count - popcount(self.all_mask & ~self.revealed & ~exposed)
+		bomb_counts = [set([popcount(configuration) for configuration in configurations]) for configurations in component_configurations]
+
+		for i, configurations in enumerate(component_configurations):
+			other_totals = Board.get_possible_totals(bomb_counts[:i] + bomb_counts[i+1:], max_total)
+			component_configurations[i] = [
+				configuration for configuration in configurations
+				if any(min_total <= popcount(configuration) + total <= max_total for total in other_totals)
+			]
+		totals = set([total for total in Board.get_possible_totals(bomb_counts, max_total) if total >= min_total])
+		return [(components[i][0], component_configurations[i]) for i in range(len(components))], totals
+
+	def get_configurations(self, component, constraints, max_total):
+		"""Return the bomb masks of every configuration of the tiles in component that satisfies the numbers in constraints
+		and has at most max_total bombs."""
+		tiles = []
+		while component:
+			tiles.append((component & -component).bit_length() - 1)
+			component &= component - 1
+		tile_bits = [1 << tile for tile in tiles]
+
+		# For every number: the bombs it still needs, how many of them are placed and how many of its tiles are unassigned
+		needed = []
+		placed = []
+		unknowns = []
+		tile_constraints = [[] for tile in tiles]
+		while constraints:
+			i = (constraints & -constraints).bit_length() - 1
+			constraints &= constraints - 1
+			unrevealed = self.neighbors[i] & ~self.revealed
+			needed.append(self.nums[i] - popcount(unrevealed & self.flagged))
+			placed.append(0)
+			unknowns.append(popcount(unrevealed & ~self.flagged))
+			for j, bit in enumerate(tile_bits):
+				if unrevealed & bit:
+					tile_constraints[j].append(len(needed) - 1)
+
+		configurations = []
+		order = constraint_order(tile_constraints)
+
+		def assign(depth, configuration, bomb_total):
+			if depth == len(tiles):
+				configurations.append(configuration)
+				return
+			j = order[depth]
+			for is_bomb in (True, False):
+				if is_bomb and bomb_total == max_total:
+					continue
+				valid = True
+				for k in tile_constraints[j]:
+					unknowns[k] -= 1
+					if is_bomb:
+						placed[k] += 1
+					if placed[k] > needed[k] or placed[k] + unknowns[k] < needed[k]:
+						valid = False
+				if valid:
+					if is_bomb:
+						assign(depth + 1, configuration | tile_bits[j], bomb_total + 1)
+					else:
+						assign(depth + 1, configuration, bomb_total)
+				for k in tile_constraints[j]:
+					unknowns[k] += 1
+					if is_bomb:
+						placed[k] -= 1
+
+		assign(0, 0, 0)
+		return configurations
+
+
+class CorpusWriter:
+	"""
+	Writes boards to a corpus file: a header (magic, version, width, height) followed by one fixed-size record per board.
+	A record is the first tile (two little-endian uint16s) followed by the bomb mask packed into ceil(width * height / 8) bytes,
+	where bit (y * width + x) stands for the tile at (x, y). Every board in a corpus has the same size.
+	"""
+
+	magic = b'MSWC'
+	version = 1
+	header = struct.Struct('<4sBHH')
+	record_header = struct.Struct('<HH')
+
+	def __init__(self, file, width, height):
+		"""
+		@param file: a file opened in binary write mode, positioned at its start
+		"""
+		self.file = file
+		self.width = width
+		self.height = height
+		self.mask_size = (width * height + 7) // 8
+		self.file.write(CorpusWriter.header.pack(CorpusWriter.magic, CorpusWriter.version, width, height))
+
+	def write(self, bomb_mask, first_tile):
+		"""Add a board given its bomb mask (see Board.get_bomb_mask) and first tile."""
+		self.file.write(CorpusWriter.record_header.pack(first_tile[0], first_tile[1]))
+		self.file.write(bomb_mask.to_bytes(self.mask_size, 'little'))
+
+	def write_board(self, board):
+		self.write(board.get_bomb_mask(), board.first_tile)
+
+
+class BoardCorpus:
+	"""
+	Read-only access to a corpus file written by CorpusWriter. The file is memory-mapped and records are only
+	decoded when asked for, so a corpus of millions of boards opens instantly and costs no memory up front.
+	"""
+
+	def __init__(self, path):
+		"""@raises ValueError if the file is not a complete corpus (the file is closed again)"""
+		self.file = open(path, 'rb')
+		self.data = None
+		try:
+			if os.fstat(self.file.fileno()).st_size < CorpusWriter.header.size:
+				raise ValueError(f'{path} is too short to be a board corpus')
+			self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+			magic, version, self.width, self.height = CorpusWriter.header.unpack_from(self.data, 0)
+			if magic != CorpusWriter.magic or version != CorpusWriter.version:
+				raise ValueError(f'{path} is not a version {CorpusWriter.version} board corpus')
+			self.mask_size = (self.width * self.height + 7) // 8
+			self.record_size = CorpusWriter.record_header.size + self.mask_size
+			records_size = len(self.data) - CorpusWriter.header.size
+			if records_size % self.record_size != 0:
+				raise ValueError(f'{path} is truncated')
+		except BaseException:
+			self.close()
+			raise
+		self.length = records_size // self.record_size
+
+	def __len__(self):
+		return self.length
+
+	def get_layout(self, index):
+		"""Return the (bomb_mask, first_tile) of the board at index without building a Board."""
+		if index < 0:
+			index += self.length
+		if not 0 <= index < self.length:
+			raise IndexError('corpus index out of range')
+		offset = CorpusWriter.header.size + index * self.record_size
+		first_tile = CorpusWriter.record_header.unpack_from(self.data, offset)
+		start = offset + CorpusWriter.record_header.size
+		return int.from_bytes(self.data[start:start + self.mask_size], 'little'), first_tile
+
+	def __getitem__(self, index):
+		"""Return the board at index, with its first tile revealed."""
+		bomb_mask, first_tile = self.get_layout(index)
+		return Board.create_from_mask(self.width, self.height, bomb_mask, first_tile)
+
+	def close(self):
+		if self.data != None:
+			self.data.close()
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+
+class BoardPrefetcher:
+	"""
+	Generates solvable boards in a background worker process ahead of time, so a new game can start without waiting.
+	Up to size boards are kept ready (or being generated) for one set of settings; every board taken is replaced
+	by a new one in the background.
+	"""
+
+	def __init__(self, width, height, bomb_percentage, size=2, workers=1, repair=True, seed=None):
+		"""
+		@param size (optional): number of boards to keep ready or in the making
+		@param workers (optional): number of worker processes generating boards
+		@param repair (optional): passed on to try_candidate_board
+		@param seed (optional): seed for the candidate seeds
+		"""
+		self.width = width
+		self.height = height
+		self.bomb_percentage = bomb_percentage
+		self.size = size
+		self.repair = repair
+		self.rng = Random(seed)
+		self.ready = [] # (bomb_array, first_tile) of the boards that are done, oldest first
+		self.in_flight = 0 # boards being generated
+		self.results = queue.Queue() # filled from the pool's result thread
+		# Spawn (rather than fork) so the workers never inherit the pygame window. A Pool (unlike a
+		# ProcessPoolExecutor) can be terminated, so closing never waits for a board still being generated.
+		self.pool = multiprocessing.get_context('spawn').Pool(workers)
+		self.fill()
+
+	def fill(self):
+		"""Start generating boards until size boards are ready or in the making."""
+		while len(self.ready) + self.in_flight < self.size:
+			self.pool.apply_async(try_candidate_board, (self.width, self.height, self.bomb_percentage, self.rng.getrandbits(32), self.repair),
+				callback=self.results.put, error_callback=self.results.put)
+			self.in_flight += 1
+
+	def collect(self, timeout=0):
+		"""Move the boards that are done into ready, waiting at most timeout seconds (None to wait forever) for one to finish."""
+		try:
+			results = [self.results.get(timeout=timeout) if timeout != 0 else self.results.get_nowait()]
+		except queue.Empty:
+			results = []
+		while not self.results.empty():
+			results.append(self.results.get_nowait())
+		for result in results:
+			self.in_flight -= 1
+			if isinstance(result, BaseException):
+				raise result
+			if result != None:
+				self.ready.append(result)
+		self.fill()
+
+	def ready_count(self):
+		"""Return the number of boards that can be taken right away."""
+		self.collect()
+		return len(self.ready)
+
+	def get(self, timeout=None):
+		"""
+		Take the oldest ready board, waiting for one if none are ready.
+		@param timeout (optional): most seconds to wait, None to wait until a board is ready
+		@return the solvable Board (with its first tile revealed), or None if none was ready in time
+		"""
+		deadline = None if timeout == None else perf_counter() + timeout
+		self.collect()
+		while not self.ready:
+			remaining = None if deadline == None else deadline - perf_counter()
+			if remaining != None and remaining <= 0:
+				return None
+			self.collect(remaining)
+		bomb_array, first_tile = self.ready.pop(0)
+		self.fill()
+		board = Board.create_custom_board(bomb_array, first_tile)
+		board.bomb_percentage = self.bomb_percentage
+		return board
+
+	def close(self):
+		"""Stop the workers right away, discarding any board still being generated."""
+		self.pool.terminate()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+
+class SolverVisualizer:
+	"""Draws a board to the pygame window while it is being solved, at most max_fps times per second,
+	so the solver spends its time solving instead of rendering every step."""
+
+	def __init__(self, max_fps=30):
+		self.min_interval = 1 / max_fps
+		self.last_draw = 0
+
+	def is_due(self):
+		"""Return True if enough time has passed since the last redraw."""
+		return time() - self.last_draw >= self.min_interval
+
+	def show(self, board):
+		pg.display.update(board.draw())
+		pg.event.pump() # Keep the window responsive during long solves
+		self.last_draw = time()
+
+
+class BudgetExceeded(Exception):
+	"""Raised inside a bounded Board.is_solvable call when its time limit or node budget runs out (see Board.check_budget)."""
+	pass
+
+
+class SolverStats:
+	"""
+	Counters that Board.is_solvable and Board.solve_state fill in while a SolverStats is attached to the board (board.stats),
+	to tell where a slow solve spends its time. One object can be shared by many boards to add up their work.
+	Every counter is a plain int or float, so leaving stats on costs a few additions per solver step.
+	"""
+
+	def __init__(self):
+		self.solves = 0 # Number of is_solvable calls
+		self.solved = 0 # Number of those that found the board solvable
+		self.budget_exceeded = 0 # Number of those that ran out of time or nodes before they could tell
+		self.solve_time = 0 # Wall time spent in is_solvable, in seconds
+		self.tier_calls = {} # Solver tier ('quick', 'subset', 'bitboard' or a backend name) to number of calls
+		self.tier_time = {} # Solver tier to wall time spent in it, in seconds
+		self.tier_nodes = {} # Solver tier to number of search nodes it visited
+		self.validity_checks = 0 # Number of configurations checked against the numbers (by the search or is_valid_configuration)
+		self.peak_configurations = 0 # Most configurations held at once by a configuration search
+		self.frontier_sizes = {} # Number of exposed tiles to number of times the solver worked on a frontier of that size
+		self.cache_hits = 0 # Components whose configurations were found in Board.component_cache
+		self.cache_misses = 0 # Components that had to be enumerated
+
+	@property
+	def nodes(self):
+		"""Total number of search nodes visited by every tier."""
+		return sum(self.tier_nodes.values())
+
+	@property
+	def max_frontier(self):
+		return max(self.frontier_sizes, default=0)
+
+	def record_solve(self, seconds, solved):
+		self.solves += 1
+		self.solved += 1 if solved else 0
+		self.budget_exceeded += 1 if solved == None else 0
+		self.solve_time += seconds
+
+	def record_tier(self, name, seconds, nodes):
+		self.tier_calls[name] = self.tier_calls.get(name, 0) + 1
+		self.tier_time[name] = self.tier_time.get(name, 0) + seconds
+		self.tier_nodes[name] = self.tier_nodes.get(name, 0) + nodes
+
+	def record_configurations(self, n_configurations):
+		self.peak_configurations = max(self.peak_configurations, n_configurations)
+
+	def record_frontier(self, size):
+		self.frontier_sizes[size] = self.frontier_sizes.get(size, 0) + 1
+
+	def as_dict(self):
+		"""Return every counter in a dictionary that can be written as JSON."""
+		return {
+			'solves': self.solves,
+			'solved': self.solved,
+			'budget_exceeded': self.budget_exceeded,
+			'solve_time': self.solve_time,
+			'tier_calls': dict(self.tier_calls),
+			'tier_time': dict(self.tier_time),
+			'tier_nodes': dict(self.tier_nodes),
+			'nodes': self.nodes,
+			'validity_checks': self.validity_checks,
+			'peak_configurations': self.peak_configurations,
+			'max_frontier': self.max_frontier,
+			'frontier_sizes': dict(self.frontier_sizes),
+			'cache_hits': self.cache_hits,
+			'cache_misses': self.cache_misses,
+		}
+
+
 class Timer:
 
 	def __init__(self):
@@ -744,6 +2683,70 @@ class Timer:
 			return self.time
 
 
+def popcount(mask):
+	"""Return the number of set bits in mask."""
+	return bin(mask).count('1')
+
+
+def safe_comb(n, k):
+	"""Return the number of ways to choose k items out of n (0 if that is impossible)."""
+	if k < 0 or n < 0 or k > n:
+		return 0
+	return comb(n, k)
+
+
+def constraint_order(tile_constraints):
+	"""
+	Return the order in which a configuration search should assign tiles, given the list of the constraints each tile is in.
+	The search starts from the most constrained tile and then always takes the tile sharing the most constraints with the
+	tiles already ordered (the first one on ties). This walks along the frontier instead of across the board, so every
+	number gets all of its tiles assigned, and a wrong guess gets caught, as close to the root of the search as possible.
+	Tiles without constraints come last.
+	@return a list of tile indices
+	"""
+	constraint_tiles = {}
+	for j, constraints in enumerate(tile_constraints):
+		for k in constraints:
+			constraint_tiles.setdefault(k, []).append(j)
+
+	shared = [0] * len(tile_constraints) # Constraints shared with ordered tiles (counted once per ordered tile)
+	ordered = [False] * len(tile_constraints)
+	heap = [(0, -len(constraints), j) for j, constraints in enumerate(tile_constraints)]
+	heapq.heapify(heap)
+	order = []
+	while heap:
+		negative_shared, negative_constraints, j = heapq.heappop(heap)
+		if ordered[j] or -negative_shared != shared[j]:
+			continue # Already ordered, or an outdated entry
+		ordered[j] = True
+		order.append(j)
+		for k in tile_constraints[j]:
+			for other in constraint_tiles[k]:
+				if not ordered[other]:
+					shared[other] += 1
+					heapq.heappush(heap, (-shared[other], -len(tile_constraints[other]), other))
+	return order
+
+
+def try_candidate_board(width, height, bomb_percentage, candidate_seed, repair=False, max_repairs=None, time_limit=None, max_nodes=None):
+	"""Generate a single candidate board from candidate_seed and check if it is solvable (or, with repair, make it solvable).
+	candidate_seed is the board seed, so Board.create_from_seed(width, height, bomb_percentage, first_tile, candidate_seed)
+	recreates the candidate (followed by make_solvable with repair). The first tile is picked by a generator of its own
+	so the board's generator is left for the bombs.
+	This runs in the worker processes of Board.generate_solvable_board_parallel.
+	@return a tuple (bomb_array, first_tile) if the board is solvable, None otherwise (also when the budget ran out)."""
+	board = Board(width, height, bomb_percentage, board_seed=candidate_seed)
+	first_tile = Random(f'{candidate_seed}/first tile').choice(board.get_all_tiles())
+	first_tile.first_reveal()
+	if repair:
+		solvable = board.make_solvable(max_repairs, time_limit=time_limit, max_nodes=max_nodes)
+	else:
+		solvable = board.is_solvable(time_limit=time_limit, max_nodes=max_nodes)
+	if solvable:
+		return board.get_bomb_array(), first_tile.coords
+	return None
+
+
 def is_div(a,b):
 	"""A simple function that will return True if a is divisible
 	by b. and False if it is not."""
@@ -765,6 +2768,22 @@ def mouse_tile(pos):
 	return(tile_x,tile_y)
 	#TEMPORARY
 
+def get_tile_surface(color, msg=None, font_color=None):
+	"""Returns a tile_length sized surface of a tile with the given color and text (None for no text).
+	The font is only created once and every surface is only rendered once, after that it comes from tile_surfaces."""
+	global tile_font
+	key = (color, msg, font_color)
+	if key not in tile_surfaces:
+		surface = pg.Surface((tile_length, tile_length))
+		surface.fill(color)
+		if msg != None:
+			if tile_font == None:
+				tile_font = pg.font.SysFont("Arial", int(7/6 * tile_length))
+			text = tile_font.render(str(msg), True, font_color)
+			surface.blit(text, (int(0.25*tile_length), int(-0.15*tile_length)))
+		tile_surfaces[key] = surface
+	return tile_surfaces[key]
+
 def win():
 	"""A game loop for when the player wins."""
 	if __name__ == '__main__':
@@ -786,6 +2805,8 @@ def endgame():
 	while True:
 		for event in pg.event.get():
 			if event.type == pg.QUIT or event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
+				if prefetcher != None:
+					prefetcher.close()
 				pg.quit()
 				quit()
 			elif event.type == pg.KEYDOWN:
@@ -801,13 +2822,26 @@ def main():
 	pg.display.update()
 	if use_sample_board:
 		board = Board.create_custom_board(sample, first_tile)
+		board.visualizer = visualizer
 	else:
-		# Generate solvable board
-		board = Board.generate_solvable_board(board_width, board_height, bomb_percentage=bomb_percentage, verbose=True)
+		# Take the next solvable board from the background generator, keeping the window responsive if none is ready yet
+		if prefetcher.ready_count() == 0:
+			print("Generating a solvable board...")
+		board = None
+		while board == None:
+			board = prefetcher.get(timeout=0.1)
+			for event in pg.event.get():
+				if event.type == pg.QUIT:
+					prefetcher.close()
+					pg.quit()
+					quit()
+		board.visualizer = visualizer
 		timer.start()
 		# board = Board(board_width, board_height)
 
 	screen.fill(white)
+	board.draw(draw_all=True)
+	pg.display.update()
 
 	locked = True
 	while locked:
@@ -831,8 +2865,16 @@ def main():
 				elif event.key == pg.K_s:
 					if (not board.pre_reveal):
 						print(board.is_solvable(reset_on_finish=False))
-		board.draw()
-		pg.display.update()
+				elif event.key == pg.K_h:
+					# Print the first safe tile the solver finds (treating the player's flags as bombs)
+					if (not board.pre_reveal):
+						hint = next((move for move in board.get_moves(apply=False) if not move[1]), None)
+						if hint == None:
+							print('No safe tile can be deduced')
+						else:
+							print(f'Safe: {hint[0]} (found by {hint[2]})')
+		# Only push the tiles that changed to the display
+		pg.display.update(board.draw())
 		if board.win:
 			timer.stop()
 			win()
@@ -843,6 +2885,8 @@ def main():
 			return None
 		clock.tick(60)
 
+	if prefetcher != None:
+		prefetcher.close()
 	pg.quit()
 	quit()
 
@@ -850,5 +2894,7 @@ if __name__ == '__main__':
 	pg.init()
 	pg.display.set_caption('Maxsweeper - Bombs left: N/A')
 	clock = pg.time.Clock()
+	visualizer = SolverVisualizer(max_fps=30)
 	screen = pg.display.set_mode((displayW, displayH))
+	prefetcher = None if use_sample_board else BoardPrefetcher(board_width, board_height, bomb_percentage)
 	main()
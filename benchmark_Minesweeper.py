@@ -0,0 +1,194 @@
+"""Benchmarks for the solver and the board generator.
+
+Times Board.is_solvable, Board.solve_state, Board.get_configurations and Board.generate_solvable_board over a
+matrix of board sizes, bomb percentages and fixed seeds, plus a few named hard boards, and reports the median and
+p95 time, search nodes explored and success rate of each case. Results are written as JSON so runs of different
+versions can be compared:
+
+	python benchmark_Minesweeper.py -o before.json
+	(change things)
+	python benchmark_Minesweeper.py -o after.json --compare before.json
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from random import seed
+from time import perf_counter
+
+from Minesweeper import Board, SolverStats, BudgetExceeded
+from board_fixtures import fixtures
+
+default_sizes = [(9, 9), (16, 16), (30, 16), (50, 50), (100, 100)]
+default_bomb_percentages = [10, 15, 20]
+default_time_limit = 10 # Seconds any single timed operation may take before it counts as a failure
+
+
+def percentile(values, fraction):
+	"""Return the value at the given fraction (0 to 1) of the sorted values (nearest rank)."""
+	values = sorted(values)
+	index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+	return values[index]
+
+
+def summarize(name, operation, times, nodes, successes):
+	"""Return the result record of one case."""
+	return {
+		'name': name,
+		'operation': operation,
+		'runs': len(times),
+		'median': percentile(times, 0.5),
+		'p95': percentile(times, 0.95),
+		'nodes': sum(nodes),
+		'median_nodes': percentile(nodes, 0.5),
+		'success_rate': sum(successes) / len(successes),
+	}
+
+
+def random_board(width, height, bomb_percentage, board_seed):
+	"""Return a random board (with its first tile revealed) that only depends on the seed."""
+	board = Board(width, height, bomb_percentage, board_seed=board_seed)
+	board.get_all_tiles()[(board_seed * 7919) % (width * height)].first_reveal()
+	return board
+
+
+def bounded(board, time_limit, max_nodes, function, *args):
+	"""Return function(*args), or None if it runs past time_limit seconds or max_nodes search nodes on board
+	(the same budget is_solvable takes, see Board.check_budget)."""
+	board.budget = (
+		None if time_limit == None else perf_counter() + time_limit,
+		None if max_nodes == None else board.nodes_explored + max_nodes
+	)
+	try:
+		return function(*args)
+	except BudgetExceeded:
+		return None
+	finally:
+		board.budget = None
+
+
+def time_board(board, max_frontier, backend=None, time_limit=default_time_limit, max_nodes=None):
+	"""
+	Time the solver operations on a board. Operations that run out of time_limit or max_nodes count as failures.
+	@return a dictionary of operation name to (seconds, nodes explored, success), leaving out get_configurations
+	when the exposed tiles outnumber max_frontier (it enumerates the whole frontier at once).
+	"""
+	results = {}
+
+	board.nodes_explored = 0
+	start = perf_counter()
+	changed = bounded(board, time_limit, max_nodes, board.solve_state, False, backend)
+	results['solve_state'] = (perf_counter() - start, board.nodes_explored, bool(changed))
+	board.reset()
+
+	board.nodes_explored = 0
+	start = perf_counter()
+	solvable = board.is_solvable(backend=backend, time_limit=time_limit, max_nodes=max_nodes)
+	results['is_solvable'] = (perf_counter() - start, board.nodes_explored, bool(solvable))
+
+	if len(board.get_exposed_tiles(includeFlagged=False)) <= max_frontier:
+		board.nodes_explored = 0
+		start = perf_counter()
+		configurations = bounded(board, time_limit, max_nodes, board.get_configurations)
+		results['get_configurations'] = (perf_counter() - start, board.nodes_explored, bool(configurations))
+	return results
+
+
+def run_benchmarks(sizes=default_sizes, bomb_percentages=default_bomb_percentages, seeds=range(5), max_frontier=24, max_attempts=20, backend=None, log=None, time_limit=default_time_limit, max_nodes=None):
+	"""
+	Run every case and return the list of result records.
+	@param log (optional): file to report each case to as it finishes
+	@param time_limit, max_nodes (optional): budget of every timed operation (max_nodes is per candidate when generating)
+	"""
+	results = []
+
+	def add(record):
+		results.append(record)
+		if log != None:
+			log.write(f"{record['name']:<24} {record['operation']:<24} median {record['median'] * 1000:9.2f}ms  p95 {record['p95'] * 1000:9.2f}ms  nodes {record['nodes']:>9}  success {record['success_rate']:.0%}\n")
+			log.flush()
+
+	def add_runs(name, runs):
+		for operation in ('solve_state', 'is_solvable', 'get_configurations'):
+			timed = [run[operation] for run in runs if operation in run]
+			if timed:
+				add(summarize(name, operation, [t for t, n, s in timed], [n for t, n, s in timed], [s for t, n, s in timed]))
+
+	for name, (bomb_rows, fixture_first_tile) in fixtures.items():
+		add_runs(name, [time_board(Board.create_custom_board(bomb_rows, fixture_first_tile), max_frontier, backend, time_limit, max_nodes)])
+
+	for width, height in sizes:
+		for bomb_percentage in bomb_percentages:
+			name = f'{width}x{height} {bomb_percentage}%'
+			add_runs(name, [time_board(random_board(width, height, bomb_percentage, board_seed), max_frontier, backend, time_limit, max_nodes) for board_seed in seeds])
+
+			times = []
+			nodes = []
+			successes = []
+			for board_seed in seeds:
+				seed(board_seed)
+				stats = SolverStats()
+				start = perf_counter()
+				board = Board.generate_solvable_board(width, height, bomb_percentage, max_attempts=max_attempts, stats=stats, time_limit=time_limit, max_nodes=max_nodes)
+				times.append(perf_counter() - start)
+				nodes.append(stats.nodes)
+				successes.append(board != None)
+			seed()
+			add(summarize(name, 'generate_solvable_board', times, nodes, successes))
+	return results
+
+
+def compare(results, baseline):
+	"""Return lines comparing the median of every case with the same case in baseline."""
+	baseline_medians = dict([((record['name'], record['operation']), record['median']) for record in baseline['results']])
+	lines = []
+	for record in results:
+		key = (record['name'], record['operation'])
+		if key in baseline_medians and baseline_medians[key] > 0:
+			lines.append(f"{key[0]:<24} {key[1]:<24} {record['median'] / baseline_medians[key]:6.2f}x baseline")
+	return lines
+
+
+def git_revision():
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+	except OSError:
+		return None
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Benchmark the Minesweeper solver and board generator.')
+	parser.add_argument('-o', '--output', help='file to write the JSON results to')
+	parser.add_argument('--compare', help='JSON results of an earlier run to compare the medians with')
+	parser.add_argument('--sizes', nargs='+', default=[f'{w}x{h}' for w, h in default_sizes], help='board sizes as WIDTHxHEIGHT')
+	parser.add_argument('--bomb-percentages', nargs='+', type=float, default=default_bomb_percentages)
+	parser.add_argument('--seeds', type=int, default=5, help='number of seeds per size and bomb percentage')
+	parser.add_argument('--max-frontier', type=int, default=24, help='largest frontier to time get_configurations on')
+	parser.add_argument('--max-attempts', type=int, default=20, help='max_attempts passed to generate_solvable_board')
+	parser.add_argument('--backend', default=None, help='solver backend to benchmark (see solver_backends)')
+	parser.add_argument('--time-limit', type=float, default=default_time_limit, help='seconds any single operation may take before it counts as a failure')
+	parser.add_argument('--max-nodes', type=int, default=None, help='search nodes any single operation may visit before it counts as a failure')
+	args = parser.parse_args(argv)
+
+	sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes]
+	results = run_benchmarks(sizes, args.bomb_percentages, range(args.seeds), args.max_frontier, args.max_attempts, args.backend, log=sys.stdout, time_limit=args.time_limit, max_nodes=args.max_nodes)
+	report = {
+		'revision': git_revision(),
+		'python': platform.python_version(),
+		'backend': args.backend,
+		'results': results,
+	}
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump(report, file, indent='\t')
+	if args.compare:
+		with open(args.compare) as file:
+			for line in compare(results, json.load(file)):
+				print(line)
+
+
+if __name__ == '__main__':
+	main()
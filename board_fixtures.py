@@ -0,0 +1,68 @@
+"""Named boards (bomb rows and first tile) shared by the tests and the benchmarks.
+
+Each entry can be passed straight to Board.create_custom_board:
+
+	Board.create_custom_board(*fixtures['the elusive 8'])
+"""
+
+fixtures = {
+	# Solvable, a ring of bombs around an 8
+	'the elusive 8': ([
+		'       ',
+		'       ',
+		'  xxx  ',
+		'  x x  ',
+		'  xxx  ',
+		'       ',
+		'       ',
+	], (0, 0)),
+	# Solvable (the sample board of the game)
+	'big board 1': ([
+		'  x x  xx ',
+		'        x ',
+		'      x   ',
+		'          ',
+		'x         ',
+		' xx       ',
+		'    x     ',
+		'   x  xx  ',
+		'    x xx  ',
+		'xx  x  x  ',
+	], (4, 4)),
+	# Not solvable, and the solver has to search to find that out
+	'big board 2': ([
+		'    x  x  ',
+		' x  x     ',
+		' x     x x',
+		'x      xxx',
+		'     xx  x',
+		'     x    ',
+		'   x    xx',
+		' x x   xxx',
+		'   xx     ',
+		'   x xxxx ',
+	], (2, 4)),
+	# Solvable with the quick rules alone
+	'quick solve': ([
+		'   xxxx xx   x  x x     x',
+		'   x    x     x       x x',
+		'  x      x          x    ',
+		'x      x    x     x      ',
+		'x  x              x     x',
+		'x         xx   xx x    x ',
+		' x x  xxx  x x x     x x ',
+		'x      x  xx        x   x',
+		'      x  x    x    x     ',
+		'   x x  x      x        x',
+		'     x x       x    x    ',
+		'x   x         x  x   x   ',
+		'   x        xx      x   x',
+		'  xx     xxx           xx',
+		'  x    x                 ',
+		'       x      x          ',
+		'       xx      xxxx x  x ',
+		'    x  x         x  x    ',
+		'xx      x xx          x  ',
+		'                x  x     ',
+	], (5, 4)),
+}
@@ -0,0 +1,166 @@
+"""Generate a pool of solvable (no-guess) boards from the command line.
+
+Boards are written as they are found, one JSON object per line:
+
+	{"width": 30, "height": 16, "bomb_percentage": 20, "first_tile": [4, 7], "bombs": ["  x ...", ...]}
+
+"bombs" and "first_tile" can be passed straight to Board.create_custom_board.
+With --corpus the boards are written in the bit-packed corpus format instead (see CorpusWriter / BoardCorpus).
+Example:
+
+	python generate_boards.py 100 --width 30 --height 16 --bomb-percentage 20 --workers 8 -o boards.jsonl
+	python generate_boards.py 1000000 --width 30 --height 16 --bomb-percentage 20 --corpus -o boards.corpus
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1' # Keep stdout clean for the boards
+import argparse
+import json
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from random import Random
+from time import time, perf_counter
+
+from Minesweeper import try_candidate_board, CorpusWriter
+
+
+def board_record(width, height, bomb_percentage, bomb_array, first_tile):
+	"""Return the line written for a board."""
+	return json.dumps({
+		'width': width,
+		'height': height,
+		'bomb_percentage': bomb_percentage,
+		'first_tile': list(first_tile),
+		'bombs': [''.join(row) for row in bomb_array],
+	})
+
+
+def bomb_array_to_mask(bomb_array):
+	"""Return the bomb mask (see Board.get_bomb_mask) of an array of "x"s and " "s."""
+	width = len(bomb_array[0])
+	bomb_mask = 0
+	for y, row in enumerate(bomb_array):
+		for x, cell in enumerate(row):
+			if cell == 'x':
+				bomb_mask |= 1 << (y * width + x)
+	return bomb_mask
+
+
+def rate(found, elapsed):
+	"""Return boards per second, 0 if no time has passed yet."""
+	return found / elapsed if elapsed > 0 else 0
+
+
+def generate_boards(count, width, height, bomb_percentage, workers=1, output=sys.stdout, seed=None, log=None, corpus=False, repair=False, max_attempts=None, time_limit=None):
+	"""
+	Generate count solvable boards and write them to output as soon as they are found.
+	Stops early (with fewer than count boards) once max_attempts candidates have been tried or time_limit has run out.
+	@param workers (optional): number of processes trying candidate boards
+	@param seed (optional): seed for the candidate seeds, so a run can be repeated (with workers=1 the output is identical)
+	@param log (optional): file to report progress and throughput to
+	@param corpus (optional): write a bit-packed corpus (output must then be opened in binary mode) instead of JSON lines
+	@param repair (optional): repair candidates the solver gets stuck on instead of throwing them away (see Board.make_solvable)
+	@param max_attempts (optional): most candidates to try, None for no limit
+	@param time_limit (optional): most seconds to spend, None for no limit
+	@return a tuple (boards found, candidates tried, seconds taken)
+	"""
+	rng = Random(seed)
+	if corpus:
+		corpus_writer = CorpusWriter(output, width, height)
+	start = time()
+	deadline = None if time_limit == None else perf_counter() + time_limit
+	found = 0
+	tried = 0
+	submitted = 0
+
+	def may_try():
+		"""Return True if another candidate may be started."""
+		if max_attempts != None and submitted >= max_attempts:
+			return False
+		return deadline == None or perf_counter() < deadline
+
+	def write(result):
+		bomb_array, first_tile = result
+		if corpus:
+			corpus_writer.write(bomb_array_to_mask(bomb_array), first_tile)
+		else:
+			output.write(board_record(width, height, bomb_percentage, bomb_array, first_tile) + '\n')
+		output.flush()
+		if log != None:
+			elapsed = time() - start
+			log.write(f'{found} / {count} boards, {tried} candidates, {rate(found, elapsed):.2f} boards/s\n')
+
+	if workers <= 1:
+		while found < count and may_try():
+			submitted += 1
+			tried += 1
+			remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+			result = try_candidate_board(width, height, bomb_percentage, rng.getrandbits(32), repair, time_limit=remaining)
+			if result != None:
+				found += 1
+				write(result)
+		return found, tried, time() - start
+
+	executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+	try:
+		pending = set()
+		while found < count:
+			# Keep every worker busy with a candidate queued behind the one it is working on
+			while len(pending) < workers * 2 and may_try():
+				submitted += 1
+				remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+				pending.add(executor.submit(try_candidate_board, width, height, bomb_percentage, rng.getrandbits(32), repair, time_limit=remaining))
+			if not pending:
+				break
+			remaining = None if deadline == None else max(deadline - perf_counter(), 0)
+			done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+			if not done:
+				break
+			for future in done:
+				tried += 1
+				result = future.result()
+				if result != None and found < count:
+					found += 1
+					write(result)
+	finally:
+		executor.shutdown(wait=False, cancel_futures=True)
+	return found, tried, time() - start
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Generate solvable Minesweeper boards, one JSON record per line.')
+	parser.add_argument('count', type=int, help='number of boards to generate')
+	parser.add_argument('--width', type=int, default=20)
+	parser.add_argument('--height', type=int, default=20)
+	parser.add_argument('--bomb-percentage', type=float, default=18)
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes (default: one per CPU)')
+	parser.add_argument('--seed', type=int, default=None)
+	parser.add_argument('-o', '--output', default='-', help='file to write the boards to (default: stdout)')
+	parser.add_argument('--corpus', action='store_true', help='write a bit-packed corpus file instead of JSON lines')
+	parser.add_argument('--repair', action='store_true', help='move bombs away from where the solver gets stuck instead of throwing the candidate away')
+	parser.add_argument('--max-attempts', type=int, default=None, help='give up after trying this many candidates')
+	parser.add_argument('--time-limit', type=float, default=None, help='give up after this many seconds')
+	parser.add_argument('-q', '--quiet', action='store_true', help="don't report progress on stderr")
+	args = parser.parse_args(argv)
+
+	if args.corpus:
+		output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+	else:
+		output = sys.stdout if args.output == '-' else open(args.output, 'w')
+	try:
+		found, tried, elapsed = generate_boards(
+			args.count, args.width, args.height, args.bomb_percentage,
+			workers=args.workers, output=output, seed=args.seed, log=None if args.quiet else sys.stderr, corpus=args.corpus,
+			repair=args.repair, max_attempts=args.max_attempts, time_limit=args.time_limit
+		)
+	finally:
+		if args.output != '-':
+			output.close()
+	sys.stderr.write(f'Generated {found} boards from {tried} candidates in {elapsed:.2f}s ({rate(found, elapsed):.2f} boards/s)\n')
+	if found < args.count:
+		sys.stderr.write(f'Gave up after generating {found} of {args.count} boards\n')
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -1,7 +1,23 @@
 import unittest
 
 from Minesweeper import *
+import Minesweeper
 from random import seed
+from itertools import combinations, product
+from io import StringIO
+from contextlib import redirect_stderr
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import warnings
+import gc
+
+import tracemalloc
+import generate_boards
+from board_fixtures import fixtures
+import benchmark_Minesweeper
 
 class TestingTools:
     """
@@ -269,6 +285,18 @@ class ConfigurationsGenerator(unittest.TestCase):
         TestingTools.validate_config(board, config)
         self.assertEqual(board.get_configurations_helper(config), [])
 
+    def test_depth_deprecated(self):
+        board = Board.create_state(
+            [
+                ['x', 'r', 'r'],
+                ['r', ' ', 'x'],
+                ['r', 'x', 'x']
+            ]
+        )
+        config = dict([(tile.coords, None) for tile in board.get_exposed_tiles(includeFlagged=False)])
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(board.get_configurations_helper(config, 0), board.get_configurations_helper(config))
+
     def test_one_solution1(self):
         board = Board.create_state(
             [
@@ -422,6 +450,64 @@ class ConfigurationsGenerator(unittest.TestCase):
             ]
         ), configurations)
 
+    def test_matches_is_valid_configuration(self):
+        # The running counts must accept exactly the configurations is_valid_configuration accepts
+        seed(2024)
+        for i in range(20):
+            board = Board(6, 6, 20)
+            board.get_all_tiles()[i].first_reveal()
+            exposed_tiles = board.get_exposed_tiles(includeFlagged=False)
+            if len(exposed_tiles) > 12:
+                continue
+            expected = []
+            for bombs in product((True, False), repeat=len(exposed_tiles)):
+                configuration = dict([(tile.coords, is_bomb) for tile, is_bomb in zip(exposed_tiles, bombs)])
+                if board.is_valid_configuration(configuration):
+                    expected.append(configuration)
+            self.assertCountEqual(board.get_configurations(), expected)
+        seed() # Clear seed
+
+class Components(unittest.TestCase):
+    """
+    Tests for Board.get_components() and Board.get_component_configurations()
+    """
+
+    def setUp(self):
+        self.board = Board.create_state(
+            [
+                [' ', 'r', 'r', 'r', ' '],
+                ['x', 'r', 'r', 'r', 'x']
+            ], (2, 0)
+        )
+
+    def test_split(self):
+        components = self.board.get_components()
+        self.assertEqual(len(components), 2)
+        self.assertEqual([tile.coords for tile in components[0][0]], [(0, 0), (0, 1)])
+        self.assertEqual([tile.coords for tile in components[1][0]], [(4, 0), (4, 1)])
+        self.assertEqual(set([tile.coords for tile in components[0][1]]), {(1, 0), (1, 1)})
+
+    def test_component_configurations(self):
+        component_configurations, totals = self.board.get_component_configurations()
+        self.assertEqual(totals, {2})
+        self.assertEqual(len(component_configurations), 2)
+        for configurations in component_configurations:
+            self.assertEqual(len(configurations), 2)
+
+    def test_matches_full_enumeration(self):
+        # Combining the components must allow exactly the tiles that the whole-board configurations allow
+        seed(4321)
+        for _ in range(20):
+            board = Board(8, 8, 20)
+            board.tiles[randint(0, 7)][randint(0, 7)].first_reveal()
+            configurations = board.get_configurations()
+            component_configurations, totals = board.get_component_configurations()
+            self.assertEqual(totals, set([list(configuration.values()).count(True) for configuration in configurations]))
+            for configurations_of_component in component_configurations:
+                for configuration in configurations_of_component:
+                    self.assertTrue(any(all(full[key] == value for key, value in configuration.items()) for full in configurations))
+        seed() # Clear seed
+
 class SolveState(unittest.TestCase):
     """
     Tests for Board.solve_state()
@@ -475,6 +561,107 @@ class SolveState(unittest.TestCase):
         )
         self.assertFalse(board.solve_state())
 
+class ConstraintOrder(unittest.TestCase):
+    """
+    Tests for constraint_order()
+    """
+
+    def test_order(self):
+        # Most constrained tile first, then along shared constraints, unconstrained tiles last
+        self.assertEqual(constraint_order([[], [0], [2], [0, 1], [1, 2]]), [3, 4, 1, 2, 0])
+
+class SubsetSolveState(unittest.TestCase):
+    """
+    Tests for Board.subset_solve_state()
+    """
+
+    def test_subset(self):
+        # Each 1 on the side shares both of its unknowns with the 1 in the middle, so the middle 1's third unknown is safe
+        board = Board.create_state(
+            [
+                [' ', 'x', ' '],
+                ['r', 'r', 'r'],
+                ['r', 'r', 'r']
+            ], (1, 2)
+        )
+        self.assertFalse(board.quick_solve_state())
+        self.assertTrue(board.subset_solve_state())
+        self.assertTrue(board.tiles[0][0].is_revealed or board.tiles[0][2].is_revealed)
+        self.assertFalse(board.tiles[0][1].is_revealed)
+
+    def test_one_two_one(self):
+        board = Board.create_state(
+            [
+                [' ', 'x', ' ', 'x', ' '],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r']
+            ], (2, 2)
+        )
+        while board.subset_solve_state() or board.quick_solve_state():
+            pass
+        self.assertEqual(board.get_state()[0], ['r', 'F', 'r', 'F', 'r'])
+
+    def test_sound(self):
+        seed(5566)
+        for _ in range(20):
+            board = Board(10, 10, 18)
+            board.tiles[randint(0, 9)][randint(0, 9)].first_reveal()
+            while board.quick_solve_state() or board.subset_solve_state():
+                pass
+            self.assertFalse(board.lose)
+            self.assertTrue(all([tile.is_bomb for tile in board.get_all_tiles() if tile.is_flagged]))
+        seed() # Clear seed
+
+class Backends(unittest.TestCase):
+    """
+    Tests for the solver backends and CardinalitySolver
+    """
+
+    def test_cardinality_solver(self):
+        solver = CardinalitySolver(4)
+        solver.add_constraint([0, 1], 1, 1)
+        solver.add_constraint([1, 2, 3], 2, 2)
+        solver.add_constraint([0, 3], 0, 0)
+        self.assertEqual(solver.solve(), [False, True, True, False])
+        self.assertEqual(solver.solve(assumptions=[(0, True)]), None)
+
+    def test_unsatisfiable(self):
+        solver = CardinalitySolver(3)
+        solver.add_constraint([0, 1, 2], 2, 2)
+        solver.add_constraint([0, 1], 0, 0)
+        self.assertEqual(solver.solve(), None)
+
+    def test_dpll_deductions(self):
+        board = Board.create_state(
+            [
+                ['r', 'r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['x', ' ', ' ', 'x', ' '],
+                [' ', ' ', ' ', 'x', ' ']
+            ], (0, 0)
+        )
+        safe_tiles, bomb_tiles, unexposed_safe = solver_backends['dpll'].get_deductions(board)
+        enumerated = solver_backends['enumerate'].get_deductions(board)
+        self.assertEqual(set(safe_tiles), set(enumerated[0]))
+        self.assertEqual(set(bomb_tiles), set(enumerated[1]))
+        self.assertEqual(unexposed_safe, enumerated[2])
+
+    def test_backends_agree(self):
+        seed(7788)
+        for _ in range(15):
+            board = Board(10, 10, 18)
+            board.tiles[randint(0, 9)][randint(0, 9)].first_reveal()
+            solvable = board.is_solvable()
+            self.assertEqual(board.is_solvable(backend='dpll'), solvable)
+            self.assertEqual(board.is_solvable(backend=ProbabilityBackend()), solvable)
+        seed() # Clear seed
+
+    def test_unknown_backend(self):
+        board = Board.create_custom_board([['x', ' ', ' '], [' ', ' ', ' ']], (2, 1))
+        with self.assertRaises(ValueError):
+            board.is_solvable(backend='magic')
+
 class Solve(unittest.TestCase):
     """
     Tests for Board.is_solvable()
@@ -543,69 +730,389 @@ class Solve(unittest.TestCase):
 
 
     def test_big_board1(self):
-        board = Board.create_custom_board(
-            [
-                [' ', ' ', 'x', ' ', 'x', ' ', ' ', 'x', 'x', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                ['x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', 'x', ' ', ' ', 'x', 'x', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', 'x', ' ', 'x', 'x', ' ', ' '] ,
-                ['x', 'x', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' '] ,
-            ], (4,4)
-        )
+        board = Board.create_custom_board(*fixtures['big board 1'])
         self.assertTrue(board.is_solvable())
 
     def test_big_board2(self):
-        board = Board.create_custom_board(
-            [
-                [' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' '] ,
-                [' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x', ' ', 'x'] ,
-                ['x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x', 'x'] ,
-                [' ', ' ', ' ', ' ', ' ', 'x', 'x', ' ', ' ', 'x'] ,
-                [' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', 'x'] ,
-                [' ', 'x', ' ', 'x', ' ', ' ', ' ', 'x', 'x', 'x'] ,
-                [' ', ' ', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', 'x', ' ', 'x', 'x', 'x', 'x', ' '] ,
-            ], (2,4)
-        )
+        board = Board.create_custom_board(*fixtures['big board 2'])
         self.assertFalse(board.is_solvable())
 
     def test_quick_solve(self):
         # This test should be really quick if you are performing basic checks
-        board = Board.create_custom_board(
-            [
-                [' ', ' ', ' ', 'x', 'x', 'x', 'x', ' ', 'x', 'x', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x'] ,
-                [' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', 'x'] ,
-                [' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' '] ,
-                ['x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                ['x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x'] ,
-                ['x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x', ' ', ' ', ' ', 'x', 'x', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' '] ,
-                [' ', 'x', ' ', 'x', ' ', ' ', 'x', 'x', 'x', ' ', ' ', 'x', ' ', 'x', ' ', 'x', ' ', ' ', ' ', ' ', ' ', 'x', ' ', 'x', ' '] ,
-                ['x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', 'x'] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', 'x', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x'] ,
-                [' ', ' ', ' ', ' ', ' ', 'x', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' '] ,
-                ['x', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', 'x', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x'] ,
-                [' ', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', 'x', 'x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x'] ,
-                [' ', ' ', 'x', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', 'x', 'x', 'x', ' ', 'x', ' ', ' ', 'x', ' '] ,
-                [' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' '] ,
-                ['x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', 'x', 'x', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' '] ,
-                [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', ' ', 'x', ' ', ' ', 'x', ' ', ' ', ' ', ' ', ' ']
-            ], (5,4)
-        )
+        board = Board.create_custom_board(*fixtures['quick solve'])
         self.assertTrue(board.is_solvable())
 
     def test_the_elusive_8(self):
+        board = Board.create_custom_board(*fixtures['the elusive 8'])
+        self.assertTrue(board.is_solvable())
+
+class BitBoardSolve(unittest.TestCase):
+    """
+    Tests for Board.to_bitboard(), Board.load_bitboard() and solving with BitBoard
+    """
+
+    def test_round_trip(self):
+        board = Board.create_state(
+            [
+                ['r', 'r', 'F', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['F', ' ', ' ', 'F', ' '],
+                [' ', ' ', ' ', 'F', ' ']
+            ], (0, 0)
+        )
+        bitboard = board.to_bitboard()
+        self.assertEqual(bitboard.nums[1 * 5 + 1], 1)
+        self.assertEqual(bitboard.get_exposed_mask(), sum([1 << (3 * 5 + x) for x in (1, 2, 4)]))
+        bitboard.reveal(1 << (3 * 5 + 2))
+        board.load_bitboard(bitboard)
+        self.assertTrue(board.tiles[3][2].is_revealed)
+        self.assertEqual(board.to_bitboard().revealed, bitboard.revealed)
+
+    def test_matches_tile_solver(self):
+        seed(98765)
+        for _ in range(15):
+            board = Board(10, 10, 17)
+            board.tiles[randint(0, 9)][randint(0, 9)].first_reveal()
+            solvable = board.is_solvable(use_bitboard=True)
+            self.assertEqual(solvable, board.is_solvable())
+        seed() # Clear seed
+
+    def test_write_back(self):
         board = Board.create_custom_board(
+            [
+                ['x', 'x', ' '],
+                [' ', ' ', 'x'],
+                [' ', ' ', 'x']
+            ], (0, 2)
+        )
+        self.assertTrue(board.is_solvable(reset_on_finish=False, use_bitboard=True))
+        self.assertTrue(board.tiles[0][2].is_revealed)
+        self.assertTrue(board.tiles[0][0].is_flagged)
+        self.assertEqual(sum([1 if tile.is_revealed else 0 for tile in board.get_all_tiles()]), 5)
+
+class Probabilities(unittest.TestCase):
+    """
+    Tests for Board.get_bomb_weights(), Board.get_probabilities() and Board.get_best_guess()
+    """
+
+    def test_fifty_fifty(self):
+        board = Board.create_state(
+            [
+                ['r', 'r'],
+                ['r', 'r'],
+                [' ', 'x']
+            ], (0, 0)
+        )
+        self.assertEqual(board.get_probabilities(), {(0, 2): 0.5, (1, 2): 0.5})
+
+    def test_flagged_tile(self):
+        # Flags that were not placed by the solver still count as bombs
+        board = Board.create_state(
+            [
+                ['r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r'],
+                ['F', ' ', ' ', ' '],
+                [' ', ' ', ' ', 'x']
+            ], (0, 0)
+        )
+        probabilities = board.get_probabilities()
+        self.assertEqual(probabilities[(3, 3)], 1.0)
+        self.assertEqual(sum(probabilities.values()), 1.0)
+
+    def test_bitboard_combination(self):
+        board = Board.create_custom_board([['x', ' ', ' '], [' ', ' ', ' ']], (2, 1))
+        with self.assertRaises(ValueError):
+            board.is_solvable(use_bitboard=True, use_probabilities=True)
+
+    def test_matches_brute_force(self):
+        seed(1122)
+        for _ in range(10):
+            board = Board(5, 5, 20)
+            board.tiles[randint(0, 4)][randint(0, 4)].first_reveal()
+            unknown_tiles = [tile for tile in board.get_all_tiles() if not tile.is_revealed]
+            bomb_counts = dict([(tile.coords, 0) for tile in unknown_tiles])
+            total = 0
+            for bombs in combinations(unknown_tiles, board.bomb_count):
+                if all([sum([1 for neighbor in tile.surrounding_bombs(mode=3) if neighbor in bombs]) == tile.num for tile in board.nummed_tiles]):
+                    total += 1
+                    for tile in bombs:
+                        bomb_counts[tile.coords] += 1
+            probabilities = board.get_probabilities()
+            self.assertEqual(set(probabilities), set(bomb_counts))
+            for coords in bomb_counts:
+                self.assertAlmostEqual(probabilities[coords], bomb_counts[coords] / total)
+        seed() # Clear seed
+
+    def test_best_guess(self):
+        board = Board.create_state(
+            [
+                ['r', 'r', 'r', ' ', ' '],
+                ['r', 'r', 'r', ' ', ' '],
+                ['r', 'x', ' ', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' ']
+            ], (0, 0)
+        )
+        probabilities = board.get_probabilities()
+        best = board.get_best_guess()
+        self.assertEqual(probabilities[best], min(probabilities.values()))
+
+    def test_solve_matches_enumeration(self):
+        seed(3344)
+        for _ in range(15):
+            board = Board(10, 10, 17)
+            board.tiles[randint(0, 9)][randint(0, 9)].first_reveal()
+            self.assertEqual(board.is_solvable(use_probabilities=True), board.is_solvable())
+        seed() # Clear seed
+
+class Frontier(unittest.TestCase):
+    """
+    Tests for Board.frontier and Board.unsatisfied_tiles
+    """
+
+    def test_matches_full_scan(self):
+        seed(1357)
+        board = Board(12, 12, 16)
+        board.tiles[6][6].first_reveal()
+        while True:
+            expected = [tile for tile in board.get_all_tiles() if not tile.is_revealed and any([neighbor.is_revealed for neighbor in tile.surrounding_bombs(mode=3)])]
+            self.assertEqual(board.get_exposed_tiles(), expected)
+            unsatisfied = [tile for tile in board.nummed_tiles if any([not neighbor.is_revealed and not neighbor.is_flagged for neighbor in tile.surrounding_bombs(mode=3)])]
+            self.assertEqual(set(board.unsatisfied_tiles), set(unsatisfied))
+            for tile in board.get_all_tiles():
+                self.assertEqual(tile.n_unknown, sum([1 for neighbor in tile.surrounding_bombs(mode=3) if not neighbor.is_revealed and not neighbor.is_flagged]))
+            if not board.solve_state():
+                break
+        seed() # Clear seed
+
+    def test_flagging(self):
+        board = Board.create_state(
+            [
+                ['r', 'r', 'r'],
+                ['r', 'r', 'r'],
+                [' ', 'x', ' ']
+            ], (0, 0)
+        )
+        self.assertEqual(len(board.unsatisfied_tiles), 3)
+        board.tiles[2][0].reveal()
+        board.tiles[2][2].reveal()
+        self.assertEqual(len(board.unsatisfied_tiles), 5)
+        board.tiles[2][1].is_flagged = True
+        self.assertEqual(len(board.unsatisfied_tiles), 0)
+        self.assertEqual(board.get_exposed_tiles(includeFlagged=False), [])
+        board.tiles[2][1].is_flagged = False
+        self.assertEqual(len(board.unsatisfied_tiles), 5)
+
+class Reveal(unittest.TestCase):
+    """
+    Tests for Board.compute_nums() and Tile.reveal()
+    """
+
+    def test_nums(self):
+        seed(2468)
+        board = Board(12, 9, 25)
+        board.tiles[4][6].first_reveal()
+        for tile in board.get_all_tiles():
+            self.assertEqual(tile.num, 0 if tile.is_bomb else tile.surrounding_bombs(mode=1))
+        seed() # Clear seed
+
+    def test_large_empty_area(self):
+        # Opening this recursively would go far past the recursion limit
+        board = Board(200, 200, 0)
+        board.tiles[100][100].first_reveal()
+        self.assertTrue(all([tile.is_revealed for tile in board.get_all_tiles()]))
+        self.assertEqual(board.nummed_tiles, [])
+
+    def test_flagged_tiles_stay_closed(self):
+        board = Board(4, 3, 0)
+        board.add_bombs(board.tiles[0][0])
+        board.tiles[1][1].is_flagged = True
+        board.tiles[0][0].reveal()
+        self.assertFalse(board.tiles[1][1].is_revealed)
+        self.assertTrue(board.tiles[2][3].is_revealed)
+
+class Visualizer(unittest.TestCase):
+    """
+    Tests for Board.visualizer and SolverVisualizer
+    """
+
+    class CountingVisualizer(SolverVisualizer):
+        def __init__(self, max_fps):
+            super().__init__(max_fps)
+            self.shown = 0
+
+        def show(self, board):
+            self.shown += 1
+            self.last_draw = time()
+
+    def board(self):
+        return Board.create_custom_board(
+            [
+                [' ', ' ', ' ', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' '],
+                ['x', ' ', ' ', 'x', ' '],
+                [' ', ' ', ' ', 'x', ' ']
+            ], (0,0)
+        )
+
+    def test_headless(self):
+        board = self.board()
+        self.assertEqual(board.visualizer, None)
+        self.assertFalse(board.is_solvable())
+
+    def test_throttled(self):
+        # With a very low frame rate only the forced redraw at the end gets through, however many steps the solve takes
+        board = self.board()
+        board.visualizer = Visualizer.CountingVisualizer(max_fps=0.001)
+        board.visualizer.last_draw = time()
+        steps = 0
+        while board.solve_state():
+            steps += 1
+        board.reset()
+        board.is_solvable()
+        self.assertGreater(steps, 1)
+        self.assertEqual(board.visualizer.shown, 1)
+
+class Moves(unittest.TestCase):
+    """
+    Tests for Board.get_moves
+    """
+
+    def test_same_as_is_solvable(self):
+        for board_seed in (0, 8, 25):
+            board = Board.create_from_seed(16, 16, 18, (5, 5), board_seed)
+            solvable = board.is_solvable()
+            moves = list(board.get_moves(backend='dpll'))
+            self.assertEqual(board.width * board.height - board.n_revealed == board.bomb_count, solvable)
+            self.assertEqual(len(set([coords for coords, is_bomb, tier in moves])), len(moves))
+            for (x, y), is_bomb, tier in moves:
+                self.assertEqual(board.tiles[y][x].is_bomb, is_bomb)
+                self.assertIn(tier, ('quick', 'subset', 'dpll'))
+            if board_seed == 25:
+                self.assertIn('dpll', [tier for coords, is_bomb, tier in moves])
+
+    def test_without_applying(self):
+        board = Board.create_from_seed(16, 16, 18, (5, 5), 25)
+        state = board.get_state()
+        moves = list(board.get_moves(apply=False))
+        self.assertGreater(len(moves), 0)
+        self.assertEqual(board.get_state(), state)
+        # Only the first tier that finds anything is used
+        self.assertEqual(len(set([tier for coords, is_bomb, tier in moves])), 1)
+        for (x, y), is_bomb, tier in moves:
+            self.assertEqual(board.tiles[y][x].is_bomb, is_bomb)
+
+    def test_stop_early(self):
+        board = Board.create_from_seed(16, 16, 18, (5, 5), 25)
+        revealed = board.n_revealed
+        flagged = board.n_flagged
+        (x, y), is_bomb, tier = next(board.get_moves())
+        # Only the first move was applied
+        self.assertTrue(board.tiles[y][x].is_flagged if is_bomb else board.tiles[y][x].is_revealed)
+        self.assertEqual(board.n_flagged, flagged + 1 if is_bomb else flagged)
+        if is_bomb:
+            self.assertEqual(board.n_revealed, revealed)
+
+    def test_stats(self):
+        board = Board.create_from_seed(16, 16, 18, (5, 5), 25)
+        board.stats = SolverStats()
+        moves = list(board.get_moves(backend='dpll'))
+        tiers = set([tier for coords, is_bomb, tier in moves])
+        self.assertIn('quick', tiers)
+        self.assertIn('subset', tiers)
+        for tier in tiers:
+            self.assertGreater(board.stats.tier_calls[tier], 0)
+
+class Rendering(unittest.TestCase):
+    """
+    Tests for Board.draw, Tile.draw and get_tile_surface, drawing to an off-screen surface
+    """
+
+    def setUp(self):
+        pg.font.init()
+        screen = getattr(Minesweeper, 'screen', None)
+        self.addCleanup(lambda: setattr(Minesweeper, 'screen', screen) if screen != None else delattr(Minesweeper, 'screen'))
+        Minesweeper.screen = pg.Surface((displayW, displayH))
+
+    def test_dirty_rectangles(self):
+        board = Board.create_custom_board(sample, first_tile)
+        self.assertEqual(len(board.draw()), board.width * board.height)
+        self.assertEqual(board.draw(), [])
+        board.tiles[0][2].activate(3) # Flag a bomb
+        tile_rect = pg.Rect(3 * margin_length + 2 * tile_length, margin_length, tile_length, tile_length)
+        self.assertEqual(board.draw(), [tile_rect])
+        self.assertEqual(len(board.draw(draw_all=True)), board.width * board.height)
+        self.assertEqual(Minesweeper.screen.get_at(tile_rect.center), red)
+
+    def test_surface_cache(self):
+        surface = get_tile_surface(white, 3, tile_colors[3])
+        self.assertIs(get_tile_surface(white, 3, tile_colors[3]), surface)
+        self.assertIsNot(get_tile_surface(white, 4, tile_colors[4]), surface)
+        self.assertEqual(surface.get_size(), (tile_length, tile_length))
+
+    def test_only_changed_tiles(self):
+        board = Board.create_custom_board(sample, first_tile)
+        board.draw()
+        self.assertEqual(board.dirty_tiles, set())
+        board.tiles[0][2].activate(3)
+        self.assertEqual(board.dirty_tiles, set([(2, 0)]))
+        board.draw()
+        self.assertEqual(board.dirty_tiles, set())
+
+    def test_win(self):
+        # Flagging every bomb wins and reveals the rest of the board
+        board = Board.create_custom_board(sample, first_tile)
+        board.draw()
+        for tile in board.get_all_tiles():
+            if tile.is_bomb:
+                tile.activate(3)
+        board.draw()
+        self.assertTrue(board.win)
+        self.assertEqual(board.n_revealed, board.width * board.height - board.bomb_count)
+
+        # Revealing every other tile wins and flags every bomb
+        board = Board.create_custom_board(sample, first_tile)
+        for tile in board.get_all_tiles():
+            if not tile.is_bomb:
+                tile.activate(1)
+        board.draw()
+        self.assertTrue(board.win)
+        self.assertEqual(board.n_flagged, board.bomb_count)
+
+class Counters(unittest.TestCase):
+    """
+    Tests for Board.n_revealed, Board.n_flagged and Board.n_found
+    """
+
+    def assertCounts(self, board):
+        tiles = board.get_all_tiles()
+        self.assertEqual(board.n_revealed, sum([1 for tile in tiles if tile.is_revealed]))
+        self.assertEqual(board.n_flagged, sum([1 for tile in tiles if tile.is_flagged]))
+        self.assertEqual(board.n_found, sum([1 for tile in tiles if tile.is_found]))
+
+    def test_counters(self):
+        for compact in (False, True):
+            board = Board.create_custom_board(sample, first_tile, compact=compact)
+            self.assertCounts(board)
+            board.tiles[0][2].activate(3) # Bomb
+            board.tiles[0][3].activate(3) # Not a bomb
+            self.assertEqual((board.n_flagged, board.n_found), (2, 1))
+            self.assertCounts(board)
+            board.tiles[0][3].activate(3)
+            self.assertEqual((board.n_flagged, board.n_found), (1, 1))
+            board.is_solvable(reset_on_finish=False)
+            self.assertCounts(board)
+            board.reset()
+            self.assertEqual((board.n_flagged, board.n_found), (0, 0))
+            self.assertCounts(board)
+
+class Stats(unittest.TestCase):
+    """
+    Tests for Board.stats and SolverStats
+    """
+
+    def board(self):
+        return Board.create_custom_board(
             [
                 [' ', ' ', ' ', ' ', ' ', ' ', ' '],
                 [' ', ' ', ' ', ' ', ' ', ' ', ' '],
@@ -613,11 +1120,237 @@ class Solve(unittest.TestCase):
                 [' ', ' ', 'x', ' ', 'x', ' ', ' '],
                 [' ', ' ', 'x', 'x', 'x', ' ', ' '],
                 [' ', ' ', ' ', ' ', ' ', ' ', ' '],
-                [' ', ' ', ' ', ' ', ' ', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' ', ' ', ' ']
             ], (0,0)
         )
+
+    def test_disabled(self):
+        board = self.board()
+        self.assertEqual(board.stats, None)
         self.assertTrue(board.is_solvable())
 
+    def test_tiers(self):
+        board = self.board()
+        board.stats = SolverStats()
+        self.assertTrue(board.is_solvable())
+        stats = board.stats
+        self.assertEqual((stats.solves, stats.solved), (1, 1))
+        self.assertGreater(stats.tier_calls['quick'], 0)
+        self.assertGreater(stats.tier_calls['subset'], 0)
+        self.assertEqual(stats.max_frontier, 8)
+        self.assertLessEqual(sum(stats.tier_time.values()), stats.solve_time)
+        self.assertEqual(json.loads(json.dumps(stats.as_dict()))['solves'], 1)
+
+    def test_search(self):
+        # The quick and subset rules solve this board, so run the enumeration on the first state directly
+        board = self.board()
+        board.stats = SolverStats()
+        board.run_tier('enumerate', solver_backends['enumerate'].get_deductions, board)
+        stats = board.stats
+        self.assertEqual(stats.tier_calls, {'enumerate': 1})
+        self.assertGreater(stats.nodes, 0)
+        self.assertEqual(stats.nodes, board.nodes_explored)
+        self.assertGreater(stats.validity_checks, 0)
+        self.assertGreater(stats.peak_configurations, 0)
+
+    def test_shared(self):
+        stats = SolverStats()
+        for use_bitboard in (False, True):
+            board = self.board()
+            board.stats = stats
+            board.is_solvable(use_bitboard=use_bitboard)
+        self.assertEqual(stats.solves, 2)
+        self.assertEqual(stats.tier_calls['bitboard'], 1)
+
+class Budget(unittest.TestCase):
+    """
+    Tests for the time limits and node budgets of Board.is_solvable, Board.make_solvable and Board.generate_solvable_board
+    """
+
+    def board(self):
+        # Not solvable, and the solver has to search to find that out
+        return Board.create_custom_board(*fixtures['big board 2'])
+
+    def test_nodes(self):
+        board = self.board()
+        self.assertEqual(board.is_solvable(max_nodes=5), None)
+        self.assertEqual(board.get_state(), self.board().get_state()) # Reset like any other solve
+        self.assertEqual(board.is_solvable(max_nodes=100000), False)
+        self.assertEqual(board.budget, None)
+
+    def test_backends(self):
+        for backend in solver_backends:
+            self.assertEqual(self.board().is_solvable(backend=backend, max_nodes=0), None)
+
+    def test_time(self):
+        board = self.board()
+        board.stats = SolverStats()
+        self.assertEqual(board.is_solvable(time_limit=0), None)
+        self.assertEqual(board.stats.budget_exceeded, 1)
+        self.assertEqual(board.is_solvable(time_limit=60), False)
+
+    def test_bitboard(self):
+        with self.assertRaises(ValueError):
+            self.board().is_solvable(use_bitboard=True, max_nodes=10)
+
+    def test_make_solvable(self):
+        seed(4)
+        board = Board(16, 16, 25)
+        board.get_all_tiles()[0].first_reveal()
+        seed() # Clear seed
+        self.assertEqual(board.make_solvable(time_limit=0), None)
+
+    def test_generate_deadline(self):
+        start = time()
+        board = Board.generate_solvable_board(30, 16, 30, max_attempts=10000, time_limit=0.2)
+        self.assertLess(time() - start, 2)
+        if board != None:
+            self.assertTrue(board.is_solvable())
+
+class Compact(unittest.TestCase):
+    """
+    Tests for compact boards (Board(compact=True)) and CompactTile
+    """
+
+    def test_tiles(self):
+        board = Board(5, 4, 0, compact=True)
+        tile = board.tiles[2][3]
+        self.assertEqual((tile.x, tile.y, tile.coords), (3, 2, (3, 2)))
+        self.assertEqual(tile, board.tiles[2][3])
+        self.assertNotEqual(tile, board.tiles[3][2])
+        self.assertEqual(len(set([board.tiles[2][3], board.tiles[2][3]])), 1)
+        self.assertEqual(len(board.tiles), 4)
+        self.assertEqual(len(board.tiles[0]), 5)
+        self.assertEqual(board.tiles[-1][-1].coords, (4, 3))
+        self.assertEqual([tile.coords for row in board.tiles for tile in row], [tile.coords for tile in board.get_all_tiles()])
+        self.assertEqual(board.tiles[0][0].n_unknown, 3)
+        self.assertEqual(board.tiles[1][1].n_unknown, 8)
+        with self.assertRaises(IndexError):
+            board.tiles[4]
+
+        tile.is_flagged = True
+        tile.num = 3
+        self.assertTrue(board.tiles[2][3].is_flagged)
+        self.assertFalse(board.tiles[2][3].is_bomb)
+        self.assertEqual(board.tiles[2][3].num, 3)
+        self.assertEqual(board.tiles[1][2].n_unknown, 7)
+        with self.assertRaises(AttributeError):
+            tile.some_attribute = True
+
+    def test_same_as_tiles(self):
+        for board_seed in range(10):
+            first_tile = (board_seed % 12, board_seed % 10)
+            bomb_array = Board.create_from_seed(12, 10, 20, first_tile, board_seed).get_bomb_array()
+            self.assertEqual(sum([row.count('x') for row in bomb_array]), int(12 * 10 * 20 / 100))
+            board = Board.create_custom_board(bomb_array, first_tile)
+            compact_board = Board.create_custom_board(bomb_array, first_tile, compact=True)
+            self.assertEqual(compact_board.get_state(), board.get_state())
+            self.assertEqual(compact_board.is_solvable(reset_on_finish=False), board.is_solvable(reset_on_finish=False))
+            self.assertEqual(compact_board.get_state(), board.get_state())
+            compact_board.reset()
+            board.reset()
+            self.assertEqual(compact_board.get_state(), board.get_state())
+
+    def test_memory(self):
+        tracemalloc.start()
+        board = Board(300, 300, 15, compact=True)
+        board.tiles[150][150].first_reveal()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 300 * 300 * 20) # A Tile object alone takes more than 100 bytes
+
+class Chunked(unittest.TestCase):
+    """
+    Tests for ChunkedBoard
+    """
+
+    def test_no_repair(self):
+        # Repairing moves bombs, which a ChunkedBoard can't do, so it is refused before anything is solved
+        board = ChunkedBoard(40, 40, 20, (20, 20), board_seed=2)
+        state = board.get_state()
+        with self.assertRaises(TypeError):
+            board.make_solvable()
+        with self.assertRaises(TypeError):
+            board.relocate_bombs()
+        self.assertEqual(board.get_state(), state)
+        self.assertEqual((board.width, board.height), (40, 40))
+
+    def test_huge(self):
+        board = ChunkedBoard(10**6, 10**6, 15, (500000, 500000), board_seed=1)
+        self.assertLessEqual(len(board.chunks), 9)
+        self.assertAlmostEqual(board.bomb_count / 10**12, 0.15, places=2)
+        for i in range(10):
+            board.solve_state()
+        self.assertLess(len(board.chunks), 50)
+        self.assertFalse(board.lose)
+
+    def test_stable_layout(self):
+        board_1 = ChunkedBoard(40, 30, 20, (3, 3), chunk_size=8, board_seed=7)
+        board_2 = ChunkedBoard(40, 30, 20, (3, 3), chunk_size=8, board_seed=7)
+        # Create the chunks in a different order
+        board_2.tiles[29][39]
+        board_2.tiles[15][20]
+        self.assertEqual(board_1.get_bomb_array(), board_2.get_bomb_array())
+        self.assertNotEqual(board_1.get_bomb_array(), ChunkedBoard(40, 30, 20, (3, 3), chunk_size=8, board_seed=8).get_bomb_array())
+
+    def test_same_as_board(self):
+        for board_seed in range(5):
+            board = ChunkedBoard(37, 21, 18, (18, 10), chunk_size=8, board_seed=board_seed)
+            bomb_array = [['x' if board.is_bomb_at(x, y) else ' ' for x in range(37)] for y in range(21)]
+            self.assertEqual(board.bomb_count, sum([row.count('x') for row in bomb_array]))
+            other = Board.create_custom_board(bomb_array, (18, 10))
+            self.assertEqual(board.get_state(), other.get_state())
+            self.assertEqual([tile.num for tile in board.get_all_tiles()], [tile.num for tile in other.get_all_tiles()])
+            self.assertEqual(board.is_solvable(reset_on_finish=False), other.is_solvable(reset_on_finish=False))
+            self.assertEqual(board.get_state(), other.get_state())
+
+    def test_reset(self):
+        board = ChunkedBoard(64, 64, 15, (30, 30), chunk_size=8, board_seed=2)
+        state = board.get_state()
+        board.is_solvable()
+        self.assertEqual(board.get_state(), state)
+        self.assertEqual(board.n_flagged_by_solver, 0)
+
+class ComponentCache(unittest.TestCase):
+    """
+    Tests for Board.component_cache
+    """
+
+    def board(self):
+        board = Board(16, 16, 20, board_seed=24)
+        board.get_all_tiles()[100].first_reveal()
+        return board
+
+    def test_reused(self):
+        board = self.board()
+        board.stats = SolverStats()
+        solvable = board.is_solvable()
+        # Components the backend couldn't deduce anything from are still there in the next solve step
+        self.assertGreater(board.stats.cache_hits, 0)
+        misses = board.stats.cache_misses
+
+        # Solving again from the first state finds every component in the cache
+        self.assertEqual(board.is_solvable(), solvable)
+        self.assertEqual(board.stats.cache_misses, misses)
+        self.assertGreater(board.stats.cache_hits, 0)
+
+    def test_same_result(self):
+        for board_seed in range(10):
+            seed(board_seed)
+            board = Board(12, 12, 20)
+            board.get_all_tiles()[board_seed].first_reveal()
+            seed() # Clear seed
+            first = board.get_component_configurations()
+            self.assertEqual(board.get_component_configurations(), first)
+            board.component_cache.clear()
+            self.assertEqual(board.get_component_configurations(), first)
+
+    def test_bounded(self):
+        board = self.board()
+        board.component_cache_size = 2
+        board.is_solvable()
+        self.assertLessEqual(len(board.component_cache), 2)
+
 class GenerateSolvable(unittest.TestCase):
     """
     Tests for Board.generate_solvable_board
@@ -629,5 +1362,299 @@ class GenerateSolvable(unittest.TestCase):
         self.assertTrue(board.is_solvable())
         seed() # Clear seed
 
+    def test_parallel(self):
+        board = Board.generate_solvable_board(12, 12, 12, workers=2, max_attempts=50)
+        self.assertEqual(board.bomb_count, int(12 * 12 * 12 / 100))
+        self.assertTrue(board.is_solvable())
+
+    def test_candidate(self):
+        result = try_candidate_board(12, 12, 12, 42)
+        self.assertEqual(result, try_candidate_board(12, 12, 12, 42))
+        if result != None:
+            bomb_array, first_tile = result
+            self.assertTrue(Board.create_custom_board(bomb_array, first_tile).is_solvable())
+        seed() # Clear seed
+
+class Seeded(unittest.TestCase):
+    """
+    Tests for placing the bombs from Board.board_seed
+    """
+
+    def bombs(self, board):
+        return [tile.coords for tile in board.get_all_tiles() if tile.is_bomb]
+
+    def test_bomb_count(self):
+        for bomb_percentage in (0, 10, 25, 50, 90):
+            for compact in (False, True):
+                board = Board.create_from_seed(10, 8, bomb_percentage, (0, 3), 7, compact=compact)
+                self.assertEqual(len(self.bombs(board)), int(10 * 8 * bomb_percentage / 100))
+                self.assertEqual(board.bomb_count, int(10 * 8 * bomb_percentage / 100))
+                for tile in board.tiles[3][0].surrounding_bombs(mode=3):
+                    self.assertFalse(tile.is_bomb)
+
+    def test_too_many_bombs(self):
+        board = Board(5, 5, 100, board_seed=1)
+        with self.assertRaises(ValueError):
+            board.tiles[2][2].first_reveal()
+
+    def test_reproducible(self):
+        board = Board(16, 16, 20)
+        board.tiles[5][9].first_reveal()
+        again = Board.create_from_seed(16, 16, 20, (9, 5), board.board_seed)
+        self.assertEqual(self.bombs(again), self.bombs(board))
+        self.assertEqual(self.bombs(Board.create_from_seed(16, 16, 20, (9, 5), board.board_seed, compact=True)), self.bombs(board))
+        self.assertNotEqual(self.bombs(Board.create_from_seed(16, 16, 20, (9, 5), board.board_seed + 1)), self.bombs(board))
+
+    def test_candidate_round_trip(self):
+        # Every board the generators hand out can be recreated from its seed
+        for candidate_seed in range(5):
+            result = try_candidate_board(9, 9, 12, candidate_seed)
+            if result != None:
+                bomb_array, first_tile = result
+                self.assertEqual(Board.create_from_seed(9, 9, 12, first_tile, candidate_seed).get_bomb_array(), bomb_array)
+            bomb_array, first_tile = try_candidate_board(16, 16, 25, candidate_seed, repair=True)
+            board = Board.create_from_seed(16, 16, 25, first_tile, candidate_seed)
+            board.make_solvable()
+            self.assertEqual(board.get_bomb_array(), bomb_array)
+
+    def test_repair_reproducible(self):
+        boards = [Board.create_from_seed(16, 16, 25, (3, 3), 11) for i in range(2)]
+        for board in boards:
+            board.make_solvable()
+        self.assertEqual(self.bombs(boards[0]), self.bombs(boards[1]))
+
+class Repair(unittest.TestCase):
+    """
+    Tests for Board.relocate_bombs, Board.make_solvable and generating with repair
+    """
+
+    def assertConsistent(self, board, bomb_count):
+        self.assertEqual(sum([1 for tile in board.get_all_tiles() if tile.is_bomb]), bomb_count)
+        for tile in board.get_all_tiles():
+            self.assertEqual(tile.num, 0 if tile.is_bomb else tile.surrounding_bombs(mode=1))
+            if tile.is_revealed:
+                self.assertFalse(tile.is_bomb)
+
+    def test_relocate(self):
+        seed(3)
+        board = Board(16, 16, 20)
+        board.get_all_tiles()[40].first_reveal()
+        seed() # Clear seed
+        board.is_solvable(reset_on_finish=False)
+        revealed = [tile for tile in board.get_all_tiles() if tile.is_revealed]
+        self.assertEqual(board.relocate_bombs(2), 2)
+        self.assertConsistent(board, board.bomb_count)
+        # The state is kept (and may have opened up), so solving carries on from it
+        for tile in revealed:
+            self.assertTrue(tile.is_revealed)
+        self.assertEqual(set(board.unsatisfied_tiles), set([tile for tile in board.nummed_tiles if tile.n_unknown > 0]))
+        self.assertEqual(set(board.nummed_tiles), set([tile for tile in board.get_all_tiles() if tile.is_revealed and tile.num > 0]))
+
+    def test_relocate_to_zero(self):
+        # The revealed 1s next to the only exposed bomb become 0 tiles, stop being numbers and open up
+        # (the flagged bombs keep the opening away from the bottom rows, so there is somewhere to move it to)
+        board = Board.create_state(
+            [
+                ['r', 'r', 'r', 'r', 'r'],
+                ['r', 'r', 'r', 'r', 'r'],
+                ['x', 'r', 'r', 'r', 'r'],
+                [' ', 'F', 'F', 'F', 'F'],
+                [' ', ' ', ' ', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' ']
+            ], (4, 0)
+        )
+        self.assertEqual(board.relocate_bombs(), 1)
+        self.assertConsistent(board, 5)
+        self.assertEqual(board.tiles[1][0].num, 0)
+        self.assertTrue(board.tiles[2][0].is_revealed)
+        self.assertEqual(set(board.nummed_tiles), set([tile for tile in board.get_all_tiles() if tile.is_revealed and tile.num > 0]))
+        self.assertEqual(set(board.unsatisfied_tiles), set([tile for tile in board.nummed_tiles if tile.n_unknown > 0]))
+
+    def test_make_solvable(self):
+        for board_seed in range(5):
+            seed(board_seed)
+            board = Board(16, 16, 25)
+            board.get_all_tiles()[board_seed * 50].first_reveal()
+            self.assertTrue(board.make_solvable())
+            seed() # Clear seed
+            self.assertConsistent(board, int(16 * 16 * 25 / 100))
+            self.assertTrue(board.is_solvable())
+
+    def test_generate(self):
+        seed(8)
+        board = Board.generate_solvable_board(30, 16, 25, repair=True, max_attempts=1)
+        self.assertTrue(board.is_solvable())
+        seed() # Clear seed
+
+class Prefetcher(unittest.TestCase):
+    """
+    Tests for BoardPrefetcher
+    """
+
+    def test_get(self):
+        with BoardPrefetcher(12, 12, 15, size=2, seed=3) as prefetcher:
+            boards = [prefetcher.get(), prefetcher.get()]
+            for board in boards:
+                self.assertEqual((board.width, board.height), (12, 12))
+                self.assertEqual(board.bomb_count, int(12 * 12 * 15 / 100))
+                self.assertTrue(board.is_solvable())
+            self.assertNotEqual(boards[0].get_bomb_array(), boards[1].get_bomb_array())
+            # Taking a board starts the next one, so the queue is refilled
+            self.assertEqual(len(prefetcher.ready) + prefetcher.in_flight, 2)
+
+    def test_timeout(self):
+        with BoardPrefetcher(30, 16, 20, size=1) as prefetcher:
+            self.assertEqual(prefetcher.get(timeout=0), None)
+            self.assertEqual(prefetcher.in_flight, 1)
+
+    def test_close_does_not_wait(self):
+        # A 200x200 board takes minutes to generate; exiting right after close must not wait for it
+        script = 'from Minesweeper import BoardPrefetcher; from time import sleep\n' \
+            'prefetcher = BoardPrefetcher(200, 200, 20, size=1)\nsleep(1)\nprefetcher.close()'
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, timeout=60)
+        self.assertEqual(result.returncode, 0)
+
+class Corpus(unittest.TestCase):
+    """
+    Tests for CorpusWriter and BoardCorpus
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'boards.corpus')
+
+    def test_round_trip(self):
+        seed(24680)
+        boards = []
+        for _ in range(5):
+            board = Board(11, 7, 20)
+            board.tiles[randint(0, 6)][randint(0, 10)].first_reveal()
+            boards.append(board)
+        seed() # Clear seed
+        with open(self.path, 'wb') as file:
+            writer = CorpusWriter(file, 11, 7)
+            for board in boards:
+                writer.write_board(board)
+        self.assertEqual(os.path.getsize(self.path), CorpusWriter.header.size + 5 * (4 + 10))
+
+        with BoardCorpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 5)
+            for i, board in enumerate(boards):
+                loaded = corpus[i]
+                self.assertEqual(loaded.get_bomb_array(), board.get_bomb_array())
+                self.assertEqual(loaded.first_tile, board.first_tile)
+                self.assertEqual(loaded.get_state(), board.get_state())
+            self.assertEqual(corpus.get_layout(-1), (boards[-1].get_bomb_mask(), boards[-1].first_tile))
+            with self.assertRaises(IndexError):
+                corpus[5]
+
+    def test_not_a_corpus(self):
+        with open(self.path, 'wb') as file:
+            generate_boards.generate_boards(1, 9, 9, 12, workers=1, output=file, seed=3, corpus=True)
+        with open(self.path, 'rb') as file:
+            truncated = file.read()[:-1]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            for contents in (b'', b'MS', b'hello world', truncated):
+                with open(self.path, 'wb') as file:
+                    file.write(contents)
+                with self.assertRaises(ValueError):
+                    BoardCorpus(self.path)
+            gc.collect()
+        # The file is closed again on every error
+        self.assertEqual([warning for warning in caught if issubclass(warning.category, ResourceWarning)], [])
+
+    def test_cli(self):
+        with open(self.path, 'wb') as file:
+            generate_boards.generate_boards(2, 9, 9, 12, workers=1, output=file, seed=3, corpus=True)
+        with BoardCorpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 2)
+            self.assertTrue(corpus[1].is_solvable())
+
+class GenerateBoardsCLI(unittest.TestCase):
+    """
+    Tests for generate_boards.py
+    """
+
+    def test_records(self):
+        output = StringIO()
+        found, tried, elapsed = generate_boards.generate_boards(3, 9, 9, 12, workers=1, output=output, seed=5)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(found, 3)
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            record = json.loads(line)
+            board = Board.create_custom_board(record['bombs'], tuple(record['first_tile']))
+            self.assertEqual((board.width, board.height), (9, 9))
+            self.assertTrue(board.is_solvable())
+
+    def test_repair(self):
+        output = StringIO()
+        found, tried, elapsed = generate_boards.generate_boards(2, 16, 16, 25, workers=1, output=output, seed=4, repair=True)
+        self.assertEqual((found, tried), (2, 2))
+        for line in output.getvalue().splitlines():
+            record = json.loads(line)
+            self.assertTrue(Board.create_custom_board(record['bombs'], tuple(record['first_tile'])).is_solvable())
+
+    def test_reproducible(self):
+        outputs = [StringIO(), StringIO()]
+        for output in outputs:
+            generate_boards.generate_boards(2, 8, 8, 15, workers=1, output=output, seed=11)
+        self.assertEqual(outputs[0].getvalue(), outputs[1].getvalue())
+
+    def test_gives_up(self):
+        # Nothing this dense is solvable, so only the limits end the run
+        output = StringIO()
+        self.assertEqual(generate_boards.generate_boards(2, 16, 16, 60, workers=1, output=output, max_attempts=3)[:2], (0, 3))
+        found, tried, elapsed = generate_boards.generate_boards(2, 16, 16, 60, workers=1, output=output, time_limit=0.2)
+        self.assertEqual(found, 0)
+        self.assertLess(elapsed, 5)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_exit_code(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'boards.jsonl')
+        with self.assertRaises(SystemExit) as context:
+            with redirect_stderr(StringIO()):
+                generate_boards.main(['2', '--width', '16', '--height', '16', '--bomb-percentage', '60', '--workers', '1', '--max-attempts', '2', '-q', '-o', path])
+        self.assertEqual(context.exception.code, 1)
+
+    def test_rate(self):
+        self.assertEqual(generate_boards.rate(3, 0), 0)
+        self.assertEqual(generate_boards.rate(3, 2), 1.5)
+
+class Benchmark(unittest.TestCase):
+    """
+    Tests for benchmark_Minesweeper.py
+    """
+
+    def test_smoke(self):
+        results = benchmark_Minesweeper.run_benchmarks(sizes=[(9, 9)], bomb_percentages=[12], seeds=range(2))
+        operations = set((record['name'], record['operation']) for record in results)
+        self.assertIn(('the elusive 8', 'is_solvable'), operations)
+        self.assertIn(('9x9 12%', 'generate_solvable_board'), operations)
+        for record in results:
+            self.assertLessEqual(record['median'], record['p95'])
+            self.assertTrue(0 <= record['success_rate'] <= 1)
+        self.assertEqual(benchmark_Minesweeper.compare(results, {'results': results})[0].split()[-2], '1.00x')
+
+    def test_generation_nodes(self):
+        results = benchmark_Minesweeper.run_benchmarks(sizes=[(9, 9)], bomb_percentages=[20], seeds=range(2))
+        generation = [record for record in results if record['operation'] == 'generate_solvable_board']
+        self.assertGreater(generation[0]['nodes'], 0)
+
+    def test_budget(self):
+        # Operations that run out of their budget are timed as failures instead of running on
+        results = benchmark_Minesweeper.time_board(Board.create_custom_board(*fixtures['big board 2']), 24, time_limit=None, max_nodes=1)
+        self.assertFalse(results['is_solvable'][2])
+        self.assertFalse(results['get_configurations'][2])
+
+    def test_nodes_explored(self):
+        board = Board.create_custom_board(*fixtures['the elusive 8'])
+        board.get_configurations()
+        self.assertGreater(board.nodes_explored, 0)
+
 if __name__ == '__main__':
     unittest.main()